@@ -1,240 +1,331 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date, timedelta
-import gspread
-from google.oauth2.service_account import Credentials
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date
+from sheet_sync import IncrementalSheetSync
+from schema import CONTEST_COLUMNS, WINNER_COLUMNS
+from snapshot_store import SnapshotStore
+from sheets_pool import SheetsPool
+from refresher import DataRefresher, REFRESH_INTERVAL
+from contest_core import CardCache, ContestDataset, data_fingerprint, build_contest_cards, format_date_column
+from campaign_index import is_delivered
+from instrumentation import StageLog, StageRecorder
+from exports import EXPORT_FORMATS, WINNER_DATE_COLUMNS, available_export_formats, export_bytes, winner_export_frame
 
-# Simple connection
-def connect_sheets():
+# Copy-on-write (the default from pandas 3) lets slices of the shared dataset
+# reuse its memory instead of copying it on every rerun
+if int(pd.__version__.split('.')[0]) < 3:
     try:
-        creds_dict = dict(st.secrets["google_sheets"])
-        scopes = ['https://www.googleapis.com/auth/spreadsheets']
-        creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
-        client = gspread.authorize(creds)
-        return client
-    except Exception as e:
-        st.error(f"Error: {str(e)[:100]}")
-        return None
+        pd.set_option('mode.copy_on_write', True)
+    except KeyError:  # OptionError, pandas without copy-on-write
+        pass
 
-# Function to find column by possible names
-def find_column(df, possible_names):
-    """Find a column by possible names"""
-    for name in possible_names:
-        if name in df.columns:
-            return name
-    return None
+SPREADSHEET_KEY = "1E2qxc1kZttPQMmSXCVXFaQKVNLl_Nhe4uUPBrzf7B3U"
 
-# Function to safely convert to datetime - IMPROVED for DD-MM-YYYY format
-def safe_to_datetime(series):
-    """Safely convert series to datetime with multiple format attempts"""
-    try:
-        # First, ensure we're working with strings
-        str_series = series.astype(str).str.strip()
-        
-        # Remove common issues
-        str_series = str_series.replace(['NaT', 'NaN', 'nan', 'None', ''], pd.NA)
-        
-        # Try specific formats in order of likelihood
-        formats_to_try = [
-            '%d-%m-%Y',  # DD-MM-YYYY (your format)
-            '%d/%m/%Y',  # DD/MM/YYYY
-            '%Y-%m-%d',  # YYYY-MM-DD
-            '%d %b %Y',  # DD MMM YYYY
-            '%d %B %Y',  # DD Month YYYY
-            '%m/%d/%Y',  # MM/DD/YYYY
-            '%d-%m-%y',  # DD-MM-YY
-            '%d/%m/%y',  # DD/MM/YY
-        ]
-        
-        result = pd.Series([pd.NaT] * len(series), dtype='datetime64[ns]')
-        
-        for fmt in formats_to_try:
+# Shared connection - authorized once per process, reused by every rerun and session
+@st.cache_resource
+def get_sheets_pool():
+    return SheetsPool(st.secrets["google_sheets"], SPREADSHEET_KEY)
+
+# Only fetch appended/changed rows on refresh instead of whole worksheets
+INCREMENTAL_SYNC = True
+
+# Columns read in full on every sync, because they get edited on old rows
+SYNC_WATCH_COLUMNS = {
+    'gift_status': WINNER_COLUMNS['Gift Status'],
+    'end_date': CONTEST_COLUMNS['end_date'],
+}
+
+# Function to read all records from a worksheet
+def read_worksheet(worksheet, syncs, full=False):
+    """Return worksheet records, incrementally synced when enabled
+
+    syncs maps worksheet titles to their IncrementalSheetSync and is filled
+    in as worksheets are first read. full=True re-reads the whole worksheet.
+    """
+    if INCREMENTAL_SYNC:
+        if worksheet.title not in syncs:
+            syncs[worksheet.title] = IncrementalSheetSync(worksheet.title, watch=SYNC_WATCH_COLUMNS)
+        return syncs[worksheet.title].sync(worksheet, full=full)
+    return worksheet.get_all_records()
+
+# Cards shown per page in the Filter Contests cards view
+CARDS_PER_PAGE = 24
+
+# Function to offer a download that is only built when asked for
+def render_download(label, key, export_id, build_frame, date_columns, file_stem):
+    """Format picker plus a prepare button; the file is built once per export_id and format"""
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        fmt = st.selectbox(
+            "Format", available_export_formats(),
+            format_func=lambda f: EXPORT_FORMATS[f][0], key=f"{key}_format"
+        )
+    format_label, extension, mime = EXPORT_FORMATS[fmt]
+    prepared = st.session_state.get(key)
+    with col2:
+        if not prepared or prepared['id'] != (export_id, fmt):
+            if not st.button(f"⚙️ Prepare {format_label} file", key=f"{key}_prepare"):
+                return
             try:
-                parsed = pd.to_datetime(str_series, errors='coerce', format=fmt)
-                # Fill in any NaNs we successfully parsed
-                mask = parsed.notna() & result.isna()
-                result[mask] = parsed[mask]
-            except:
-                continue
-        
-        # If we still have NaNs, try pandas' built-in parser with dayfirst=True
-        if result.isna().any():
-            final_try = pd.to_datetime(str_series, errors='coerce', dayfirst=True)
-            mask = final_try.notna() & result.isna()
-            result[mask] = final_try[mask]
-        
-        return result
-    except Exception as e:
-        return pd.NaT
+                with st.spinner("Preparing download..."), timings.stage('export') as stage:
+                    frame = build_frame()
+                    stage['rows'] = len(frame)
+                    data = export_bytes(frame, fmt, date_columns)
+            except ValueError as e:
+                st.warning(str(e))
+                return
+            prepared = {'id': (export_id, fmt), 'data': data}
+            st.session_state[key] = prepared
+        st.download_button(label, prepared['data'], f"{file_stem}.{extension}", mime, key=f"{key}_button")
 
-# Function to determine contest status - IMPROVED
-def get_contest_status(start_date, end_date, today):
-    """Determine if contest is upcoming, running, or past"""
-    try:
-        # Handle NaT values
-        if pd.isna(start_date) or pd.isna(end_date):
-            return 'unknown'
-        
-        # Ensure we have datetime objects
-        if not isinstance(start_date, (pd.Timestamp, datetime)):
-            start_date = pd.to_datetime(start_date, errors='coerce')
-        if not isinstance(end_date, (pd.Timestamp, datetime)):
-            end_date = pd.to_datetime(end_date, errors='coerce')
-        
-        # Check again after conversion
-        if pd.isna(start_date) or pd.isna(end_date):
-            return 'unknown'
-        
-        # Get date objects
-        start_date_obj = start_date.date() if hasattr(start_date, 'date') else pd.to_datetime(start_date).date()
-        end_date_obj = end_date.date() if hasattr(end_date, 'date') else pd.to_datetime(end_date).date()
-        
-        # Determine status
-        if start_date_obj > today:
-            return 'upcoming'
-        elif start_date_obj <= today <= end_date_obj:
-            return 'running'
-        else:
-            return 'past'
-    except Exception as e:
-        return 'unknown'
+# Card HTML shared by every rerun and session, rebuilt only for changed rows or a new day
+@st.cache_resource
+def get_card_cache():
+    return CardCache()
 
-# Function to create nice contest cards - IMPROVED
-def create_contest_card(row, camp_name_col, camp_type_col, start_date_col, end_date_col,
-                       winner_date_col, kam_col, to_whom_col, eligibility_col, status):
-    """Create a nice looking contest card"""
-    camp_name = row[camp_name_col] if camp_name_col and camp_name_col in row and pd.notna(row[camp_name_col]) else 'N/A'
-    camp_type = row[camp_type_col] if camp_type_col and camp_type_col in row and pd.notna(row[camp_type_col]) else 'N/A'
-    
-    # Get contest eligibility
-    contest_eligibility = row[eligibility_col] if eligibility_col and eligibility_col in row and pd.notna(row[eligibility_col]) else 'N/A'
-   
-    # Format start date
-    start_date = 'N/A'
-    if start_date_col and start_date_col in row and pd.notna(row[start_date_col]):
-        try:
-            if hasattr(row[start_date_col], 'strftime'):
-                start_date = row[start_date_col].strftime('%d %b %Y')
+# Function to render a section's contest cards as a single HTML block
+def render_contest_cards(df, columns, status, today, page_size=None, key=None, winner_lines=None):
+    """Render cards with one st.markdown call, paginated when page_size is set"""
+    if page_size and len(df) > page_size:
+        pages = (len(df) + page_size - 1) // page_size
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=key)
+        first = (page - 1) * page_size
+        df = df.iloc[first:first + page_size]
+        if isinstance(status, pd.Series):
+            status = status.iloc[first:first + page_size]
+        st.caption(f"Showing {first + 1}–{first + len(df)}")
+    with timings.stage('render', rows=len(df)):
+        cards = build_contest_cards(df, columns, status, today, winner_lines, cache=get_card_cache())
+        if cards:
+            st.markdown('<div class="contest-card-list">' + ''.join(cards) + '</div>', unsafe_allow_html=True)
+
+# Function to show one win: contest details beside winner details and gift status
+def render_win(row, gift_status_col, contest=None):
+    """Render a winner row in two columns, with its contest's KAM and team when contest is given"""
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        # Contest Details
+        camp_desc = str(row.get('Camp Description', 'N/A')).strip()
+        contest_eligibility = str(row.get('Contest', 'N/A')).strip()
+        gift = str(row.get('Gift', 'N/A')).strip()
+
+        # Get dates from winner data
+        start_date_val = row.get('Start Date', None)
+        end_date_val = row.get('End Date', None)
+        winner_date_val = row.get('Winner Announcement Date', None)
+
+        # Format dates
+        start_date_str = 'N/A'
+        end_date_str = 'N/A'
+        winner_date_str = 'N/A'
+
+        if pd.notna(start_date_val):
+            if hasattr(start_date_val, 'strftime'):
+                start_date_str = start_date_val.strftime('%d-%m-%Y')
             else:
-                # Try to parse it
-                parsed = pd.to_datetime(str(row[start_date_col]), errors='coerce', dayfirst=True)
-                if not pd.isna(parsed):
-                    start_date = parsed.strftime('%d %b %Y')
-                else:
-                    start_date = str(row[start_date_col])
-        except:
-            start_date = str(row[start_date_col])
-   
-    # Format end date
-    end_date = 'N/A'
-    if end_date_col and end_date_col in row and pd.notna(row[end_date_col]):
-        try:
-            if hasattr(row[end_date_col], 'strftime'):
-                end_date = row[end_date_col].strftime('%d %b %Y')
+                start_date_str = str(start_date_val)
+
+        if pd.notna(end_date_val):
+            if hasattr(end_date_val, 'strftime'):
+                end_date_str = end_date_val.strftime('%d-%m-%Y')
             else:
-                # Try to parse it
-                parsed = pd.to_datetime(str(row[end_date_col]), errors='coerce', dayfirst=True)
-                if not pd.isna(parsed):
-                    end_date = parsed.strftime('%d %b %Y')
-                else:
-                    end_date = str(row[end_date_col])
-        except:
-            end_date = str(row[end_date_col])
-   
-    # Format winner date - IMPROVED
-    winner_date = 'N/A'
-    if winner_date_col and winner_date_col in row and pd.notna(row[winner_date_col]):
-        try:
-            if hasattr(row[winner_date_col], 'strftime'):
-                winner_date = row[winner_date_col].strftime('%d %b %Y')
+                end_date_str = str(end_date_val)
+
+        if pd.notna(winner_date_val):
+            if hasattr(winner_date_val, 'strftime'):
+                winner_date_str = winner_date_val.strftime('%d-%m-%Y')
             else:
-                # Try multiple parsing strategies
-                date_str = str(row[winner_date_col]).strip()
-                # Common date patterns
-                patterns = ['%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d', '%d %b %Y', '%d %B %Y', '%m/%d/%Y']
-                
-                parsed_date = None
-                for pattern in patterns:
-                    try:
-                        parsed_date = datetime.strptime(date_str, pattern)
-                        break
-                    except:
-                        continue
-                
-                if parsed_date:
-                    winner_date = parsed_date.strftime('%d %b %Y')
+                winner_date_str = str(winner_date_val)
+
+        st.markdown(f"""
+        **Camp Description:** {camp_desc}  
+        **Eligibility:** {contest_eligibility}  
+        **Prize:** {gift}  
+        **Contest Duration:** {start_date_str} to {end_date_str}
+        """)
+        if contest:
+            st.markdown(" · ".join(f"**{label}:** {value}" for label, value in contest.items()))
+
+    with col2:
+        # Winner Details with Gift Status
+        winner_name = row.get('customer_firstname', 'N/A')
+        phone = row.get('customer_phonenumber', 'N/A')
+        store = row.get('business_displayname', 'N/A')
+        bzid_val = row.get('businessid', 'N/A')
+
+        st.markdown(f"""
+        **Name:** {winner_name}  
+        **Phone:** {phone}  
+        **Store:** {store}  
+        **BZID:** {bzid_val}  
+        **Winner Date:** {winner_date_str}
+        """)
+
+        # Display Gift Status with badge
+        if gift_status_col and gift_status_col in row:
+            gift_status_val = row[gift_status_col]
+            if pd.notna(gift_status_val) and str(gift_status_val).strip():
+                gift_status_str = str(gift_status_val).strip()
+                gift_status_lower = gift_status_str.lower()
+                if 'delivered' in gift_status_lower:
+                    gift_status_class = "gift-delivered"
+                elif 'pending' in gift_status_lower or 'not' in gift_status_lower:
+                    gift_status_class = "gift-pending"
                 else:
-                    # Last resort: try pandas parsing
-                    parsed = pd.to_datetime(date_str, errors='coerce', dayfirst=True)
-                    if not pd.isna(parsed):
-                        winner_date = parsed.strftime('%d %b %Y')
-                    else:
-                        winner_date = date_str
-        except Exception as e:
-            winner_date = str(row[winner_date_col])
-   
-    kam = row[kam_col] if kam_col and kam_col in row and pd.notna(row[kam_col]) else 'N/A'
-    to_whom = row[to_whom_col] if to_whom_col and to_whom_col in row and pd.notna(row[to_whom_col]) else 'N/A'
-   
-    # Calculate days left if contest is running
-    days_left = ""
-    if status == 'running' and end_date_col and end_date_col in row and pd.notna(row[end_date_col]):
-        try:
-            if hasattr(row[end_date_col], 'date'):
-                end_date_obj = row[end_date_col].date()
+                    gift_status_class = "gift-not-found"
+
+                st.markdown(f"**Gift Status:** <span class='{gift_status_class}'>{gift_status_str}</span>", unsafe_allow_html=True)
             else:
-                end_date_obj = pd.to_datetime(row[end_date_col], dayfirst=True).date()
-            
-            today = datetime.now().date()
-            days_left_int = (end_date_obj - today).days
-            if days_left_int >= 0:
-                days_left = f"<br><strong>⏳ Days Left:</strong> {days_left_int} days"
-        except:
-            pass
-   
-    # Different styles based on status
-    if status == 'running':
-        gradient = "linear-gradient(135deg, #4CAF50 0%, #2E7D32 100%)"  # Green for running
-        badge = "🏃 RUNNING NOW"
-    elif status == 'upcoming':
-        gradient = "linear-gradient(135deg, #667eea 0%, #764ba2 100%)"  # Purple for upcoming
-        badge = "📅 UPCOMING"
-    else:  # past or unknown
-        gradient = "linear-gradient(135deg, #9e9e9e 0%, #616161 100%)"  # Grey for past
-        badge = "✅ COMPLETED"
-   
-    # Create card with contest eligibility
-    card_html = f"""
-    <div class="contest-card" style="
-        background: {gradient};
-        border-radius: 10px;
-        padding: 20px;
-        margin: 10px 0;
-        color: white;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        position: relative;
-    ">
-        <div style="position: absolute; top: 10px; right: 10px; background: rgba(255,255,255,0.2); padding: 2px 8px; border-radius: 12px; font-size: 12px;">
-            {badge}
-        </div>
-        <h3 style="margin: 0 0 10px 0; color: white; padding-right: 80px;">{camp_name}</h3>
-        <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px;">
-            <div>
-                <strong>🎯 Type:</strong> {camp_type}<br>
-                <strong>📋 Eligibility:</strong> {contest_eligibility}<br>
-                <strong>👤 KAM:</strong> {kam}<br>
-                <strong>👥 Team:</strong> {to_whom}
-            </div>
-            <div>
-                <strong>📅 Starts:</strong> {start_date}<br>
-                <strong>🏁 Ends:</strong> {end_date}<br>
-                <strong>🏆 Winner Date:</strong> {winner_date}
-                {days_left}
-            </div>
-        </div>
-    </div>
+                st.markdown("**Gift Status:** N/A")
+
+# Winner search results: page sizes offered, columns in the grid and wins shown per customer
+WINNER_PAGE_SIZES = [25, 50, 100, 250]
+WINNER_TABLE_COLUMNS = [
+    'customer_firstname', 'businessid', 'customer_phonenumber', 'business_displayname',
+    'Gift', 'Camp Description', 'Start Date', 'End Date', 'Winner Announcement Date',
+]
+WINNER_DETAIL_LIMIT = 50
+
+# Function to show one page of a frame with page size and page pickers
+def paginate(df, key, page_sizes=WINNER_PAGE_SIZES):
+    """Return the rows of the page picked by the user"""
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", page_sizes, index=1, key=f"{key}_size")
+    pages = max(1, (len(df) + page_size - 1) // page_size)
+    # The page lives only in session state (no widget default), so it can be
+    # pulled back in range when a bigger page size or a smaller result shrinks pages
+    page_key = f"{key}_page"
+    if page_key not in st.session_state:
+        st.session_state[page_key] = 1
+    elif st.session_state[page_key] > pages:
+        st.session_state[page_key] = pages
+    with col2:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+    first = (page - 1) * page_size
+    st.caption(f"Showing {first + 1}–{min(first + page_size, len(df))} of {len(df)}")
+    return df.iloc[first:first + page_size]
+
+# Function to find the Contest Details row a winner belongs to
+def linked_contest(dataset, row):
+    """Return {label: value} for the winner's contest (KAM, team, type), or None if it isn't in Contest Details"""
+    label = dataset.campaign_winners().contest_label(row.get('Camp Description'))
+    if label is None:
+        return None
+    contest = dataset.contests.loc[label]
+    columns = dataset.columns
+    fields = [("Contest KAM", columns.get('kam')), ("Team", columns.get('to_whom')), ("Camp Type", columns.get('camp_type'))]
+    return {name: contest[col] for name, col in fields if col and pd.notna(contest[col])}
+
+WINNER_SHEET_NAMES = ['Winners Details ', 'Winner Details', 'Winners Details', 'Winner Details ']
+
+# Function to fetch the Contest Details sheet
+def load_contest_data(pool, syncs, full=False):
+    contest_ws, _ = pool.worksheet(["Contest Details"])
+    if contest_ws is None:
+        raise ValueError("Worksheet 'Contest Details' not found")
+    contest_data = read_worksheet(contest_ws, syncs, full)
+    contests = pd.DataFrame(contest_data)
+    return contests
+
+# Function to fetch the Winners Details sheet
+def load_winner_data(pool, syncs, full=False):
+    winner_ws, sheet_name = pool.worksheet(WINNER_SHEET_NAMES)
+    if winner_ws is None:
+        return pd.DataFrame(), None
+    winner_data = read_worksheet(winner_ws, syncs, full)
+    winners = pd.DataFrame(winner_data)
+    return winners, sheet_name
+
+@st.cache_resource
+def get_snapshot_store():
+    return SnapshotStore()
+
+# Function to load and prepare both sheets, run on the refresher thread
+def fetch_live_dataset(current, pool, syncs, snapshot_store, stage_log, full=False):
+    """Fetch both sheets and return a prepared dataset, or current if it came from unchanged live data
+
+    Every resource is passed in by get_refresher(): this runs outside any
+    Streamlit script, where st.cache_resource getters can't be called.
+    full=True re-reads whole worksheets instead of syncing incrementally.
     """
-    return card_html
+    recorder = StageRecorder('refresh')
+    try:
+        try:
+            # One request lists every worksheet, then both sheets download side by side
+            with recorder.stage('connect'):
+                pool.worksheets()
+            with recorder.stage('fetch') as stage:
+                with ThreadPoolExecutor(max_workers=2, thread_name_prefix='sheet-fetch') as executor:
+                    contest_future = executor.submit(load_contest_data, pool, syncs, full)
+                    winner_future = executor.submit(load_winner_data, pool, syncs, full)
+                    contests = contest_future.result()
+                    winners, winner_sheet_name = winner_future.result()
+                stage['rows'] = len(contests) + len(winners)
+        except Exception:
+            # A stale handle or revoked token - reconnect on the next attempt
+            pool.reset()
+            raise
+        
+        contest_fingerprint, winner_fingerprint = data_fingerprint(contests), data_fingerprint(winners)
+        # A snapshot-restored dataset has Parquet-coerced columns, so it is always rebuilt
+        if current is not None and not current.restored and (current.contest_fingerprint, current.winner_fingerprint, current.winner_sheet_name) == (
+            contest_fingerprint, winner_fingerprint, winner_sheet_name
+        ):
+            return current
+        
+        with recorder.stage('parse', rows=len(contests) + len(winners)):
+            dataset = ContestDataset.from_frames(contests, winners, winner_sheet_name)
+            # Contest/winner join for the cards, resolved once per refresh
+            dataset.card_winner_lines()
+            # Gift delivery cube, so analytics pivots never count raw winners on a rerun
+            dataset.gift_analytics()
+        # Build today's statuses and dashboard numbers with the data, not on the first visit
+        with recorder.stage('classify', rows=len(dataset.contests)):
+            dataset.dashboard_summary(datetime.now().date())
+        snapshot_store.save(dataset.contests, dataset.winners, dataset.meta())
+        return dataset
+    finally:
+        stage_log.write(recorder)
+
+# Stage timings log, shared by the refresher and every session
+@st.cache_resource
+def get_stage_log():
+    return StageLog()
+
+# Function to read the on-disk snapshot as a dataset
+def load_snapshot_dataset(snapshot_store):
+    """Return (dataset, saved_at) from the last snapshot, or None"""
+    snapshot = snapshot_store.load()
+    if snapshot is None:
+        return None
+    contests, winners, meta = snapshot
+    dataset = ContestDataset.from_snapshot(contests, winners, meta)
+    return dataset, meta.get('saved_at')
+
+# How long the very first request waits for Sheets when there is no snapshot
+FIRST_LOAD_TIMEOUT = 120
+
+# One refresher per process: starts from the saved snapshot and reloads Sheets in the background
+@st.cache_resource
+def get_refresher():
+    # Resolved here, on the script thread, and handed to the loader
+    pool, snapshot_store, stage_log = get_sheets_pool(), get_snapshot_store(), get_stage_log()
+    # One sync state per worksheet, kept for the life of the process
+    syncs = {}
+
+    def load(current, full):
+        return fetch_live_dataset(current, pool, syncs, snapshot_store, stage_log, full)
+
+    snapshot = load_snapshot_dataset(snapshot_store)
+    if snapshot is None:
+        refresher = DataRefresher(load, REFRESH_INTERVAL)
+    else:
+        dataset, saved_at = snapshot
+        refresher = DataRefresher(load, REFRESH_INTERVAL, initial=dataset, initial_time=saved_at)
+    return refresher.start()
 
 # Initialize session state
 if 'current_section' not in st.session_state:
@@ -589,95 +680,56 @@ section = st.sidebar.radio(
     index=0  # Default to Contest Dashboard
 )
 
-# Connect to Google Sheets
-client = connect_sheets()
+# Stage timings for this rerun
+timings = StageRecorder('rerun')
+
+# Load data - always served from the last good copy while the refresher reloads Sheets in the background
+refresher = get_refresher()
+loaded = refresher.current()
+if loaded is None:
+    with st.spinner("Loading data from Google Sheets..."), timings.stage('fetch'):
+        loaded = refresher.wait(FIRST_LOAD_TIMEOUT)
 
-if client:
+if loaded:
     try:
-        sheet = client.open_by_key("1E2qxc1kZttPQMmSXCVXFaQKVNLl_Nhe4uUPBrzf7B3U")
+        dataset = loaded['value']
+        winners = dataset.winners
+        winner_sheet_name = dataset.winner_sheet_name
+        columns = dataset.columns
        
-        # Load data once and cache it
-        @st.cache_data(ttl=300)
-        def load_contest_data():
-            contest_ws = sheet.worksheet("Contest Details")
-            contest_data = contest_ws.get_all_records()
-            contests = pd.DataFrame(contest_data)
-            return contests
-       
-        @st.cache_data(ttl=300)
-        def load_winner_data():
-            winner_sheet_names = ['Winners Details ', 'Winner Details', 'Winners Details', 'Winner Details ']
-            for sheet_name in winner_sheet_names:
-                try:
-                    winner_ws = sheet.worksheet(sheet_name)
-                    winner_data = winner_ws.get_all_records()
-                    winners = pd.DataFrame(winner_data)
-                    return winners, sheet_name
-                except:
-                    continue
-            return pd.DataFrame(), None
-       
-        # Load data
-        contests = load_contest_data()
-        winners, winner_sheet_name = load_winner_data()
-       
-        if not contests.empty:
-            st.sidebar.success(f"✅ {len(contests)} contests loaded")
+        if loaded['source'] == 'snapshot':
+            st.sidebar.info(f"⏳ Showing saved data from {loaded['loaded_at'] or 'last run'} while Sheets refreshes")
+        if refresher.last_error is not None:
+            st.sidebar.warning(f"⚠️ Last refresh failed, showing the previous data: {str(refresher.last_error)[:100]}")
+        if not dataset.contests.empty:
+            st.sidebar.success(f"✅ {len(dataset.contests)} contests loaded")
         if not winners.empty:
             st.sidebar.success(f"✅ {len(winners)} winners loaded")
+        if dataset.memory_report:
+            before = sum(m['before'] for m in dataset.memory_report.values()) / 2 ** 20
+            after = sum(m['after'] for m in dataset.memory_report.values()) / 2 ** 20
+            st.sidebar.caption(f"🧮 Data in memory: {after:.1f} MB (was {before:.1f} MB as loaded)")
+        if dataset.missing_columns():
+            st.sidebar.warning(f"⚠️ Contest sheet has no column for: {', '.join(dataset.missing_columns())}")
        
-        # Process contest data - IMPROVED DATE HANDLING
-        if not contests.empty:
-            # Find important columns
-            camp_name_col = find_column(contests, ['Camp Name', 'Campaign Name', 'Camp Description', 'Camp'])
-            camp_type_col = find_column(contests, ['Camp Type', 'Type', 'Category'])
-            start_date_col = find_column(contests, ['Start Date', 'StartDate', 'Start'])
-            end_date_col = find_column(contests, ['End Date', 'EndDate', 'End'])
-            
-            # IMPROVED: Better winner date column detection
-            winner_date_col = find_column(contests, [
-                'Winner Announcement Date', 
-                'Winner Date', 
-                'Announcement Date',
-                'Winner Announcement',
-                'Winner Ann Date',
-                'Winner_Announcement_Date'
-            ])
-            
-            kam_col = find_column(contests, ['KAM', 'Owner', 'Manager', 'Responsible'])
-            to_whom_col = find_column(contests, ['To Whom?', 'To Whom', 'Assigned To', 'Team'])
-            eligibility_col = find_column(contests, ['Contest Eligiblity', 'Contest Eligibility', 'Eligibility', 'Contest Eligiblity '])
-           
-            # Fix dates safely - IMPROVED for DD-MM-YYYY format
-            if start_date_col:
-                contests[start_date_col] = safe_to_datetime(contests[start_date_col])
-                contests['Start_Date'] = contests[start_date_col]
-                # Extract year and month with error handling
-                contests['Year'] = contests['Start_Date'].dt.year.where(contests['Start_Date'].notna(), pd.NA)
-                contests['Month'] = contests['Start_Date'].dt.month_name().where(contests['Start_Date'].notna(), pd.NA)
-                contests['Month_Num'] = contests['Start_Date'].dt.month.where(contests['Start_Date'].notna(), pd.NA)
-           
-            if end_date_col:
-                contests[end_date_col] = safe_to_datetime(contests[end_date_col])
-           
-            if winner_date_col:
-                contests[winner_date_col] = safe_to_datetime(contests[winner_date_col])
-       
-        # Process winner data - IMPROVED
-        if not winners.empty:
-            # Fix dates in winner data safely
-            date_cols = ['Start Date', 'End Date', 'Winner Announcement Date']
-            for col in date_cols:
-                if col in winners.columns:
-                    winners[col] = safe_to_datetime(winners[col])
-            
-            # Find Gift Status column (handle different possible names)
-            gift_status_col = find_column(winners, ['Gift Status', 'GiftStatus', 'Status', 'Delivery Status', 'Gift_Status'])
+        camp_name_col = columns['camp_name']
+        camp_type_col = columns['camp_type']
+        start_date_col = columns['start_date']
+        end_date_col = columns['end_date']
+        winner_date_col = columns['winner_date']
+        kam_col = columns['kam']
+        to_whom_col = columns['to_whom']
+        eligibility_col = columns['eligibility']
+        gift_status_col = columns['gift_status']
        
         today = datetime.now().date()
         current_month = today.month
         current_year = today.year
        
+        # Contest status is shared by every section
+        with timings.stage('classify', rows=len(dataset.contests)):
+            contests = dataset.contests_with_status(today)
+       
         # ============================================
         # CONTEST DASHBOARD SECTION
         # ============================================
@@ -690,134 +742,55 @@ if client:
                 # ============================================
                 st.subheader("📈 Quick Overview")
                
-                # Calculate stats
-                total_contests = len(contests)
-               
-                # Current month contests
-                current_month_contests = contests[
-                    (contests['Year'] == current_year) &
-                    (contests['Month_Num'] == current_month)
-                ]
-               
-                # Calculate contest status for all contests - IMPROVED
-                contests['Status'] = 'unknown'
-                for idx, row in contests.iterrows():
-                    start_val = row[start_date_col] if start_date_col in row else None
-                    end_val = row[end_date_col] if end_date_col in row else None
-                    contests.at[idx, 'Status'] = get_contest_status(start_val, end_val, today)
-               
-                # Get contests by status - IMPROVED running contests detection
-                running_contests = contests[contests['Status'] == 'running'].copy()
-                upcoming_contests = contests[contests['Status'] == 'upcoming'].copy()
-                past_contests = contests[contests['Status'] == 'past'].copy()
-               
-                # FIX: Direct calculation of running contests to ensure accuracy
-                if start_date_col and end_date_col:
-                    # Ensure dates are datetime objects
-                    if not pd.api.types.is_datetime64_any_dtype(contests[start_date_col]):
-                        contests[start_date_col] = safe_to_datetime(contests[start_date_col])
-                    if not pd.api.types.is_datetime64_any_dtype(contests[end_date_col]):
-                        contests[end_date_col] = safe_to_datetime(contests[end_date_col])
-                    
-                    # Clear and recalculate running contests
-                    running_mask = (
-                        pd.notna(contests[start_date_col]) & 
-                        pd.notna(contests[end_date_col]) &
-                        (contests[start_date_col].dt.date <= today) & 
-                        (contests[end_date_col].dt.date >= today)
-                    )
-                    running_contests = contests[running_mask].copy()
-                    running_contests['Status'] = 'running'
-                    
-                    # Update other statuses
-                    upcoming_mask = (
-                        pd.notna(contests[start_date_col]) & 
-                        (contests[start_date_col].dt.date > today)
-                    )
-                    upcoming_contests = contests[upcoming_mask].copy()
-                    upcoming_contests['Status'] = 'upcoming'
-                    
-                    past_mask = (
-                        pd.notna(contests[end_date_col]) & 
-                        (contests[end_date_col].dt.date < today)
-                    )
-                    past_contests = contests[past_mask].copy()
-                    past_contests['Status'] = 'past'
-               
-                # Recently ended (last 7 days)
-                recently_ended = contests[
-                    (contests['Status'] == 'past') &
-                    pd.notna(contests[end_date_col]) &
-                    (contests[end_date_col].dt.date >= (today - timedelta(days=7)))
-                ]
+                # Counts, stats and groupings are worked out once per day per dataset
+                summary = dataset.dashboard_summary(today)
                
                 # Display stats in columns
                 col1, col2, col3, col4 = st.columns(4)
                
                 with col1:
-                    st.metric("Total Contests", total_contests)
+                    st.metric("Total Contests", summary['total'])
                
                 with col2:
-                    st.metric("Running Now", len(running_contests))
+                    st.metric("Running Now", summary['counts']['running'])
                
                 with col3:
-                    st.metric("Upcoming", len(upcoming_contests))
+                    st.metric("Upcoming", summary['counts']['upcoming'])
                
                 with col4:
-                    st.metric("Past/Completed", len(past_contests))
+                    st.metric("Past/Completed", summary['counts']['past'])
                
                 # ============================================
                 # ONGOING CONTESTS
                 # ============================================
-                if not running_contests.empty:
+                if summary['counts']['running']:
+                    running_stats = summary['running']
                     st.subheader("🏃 Currently Running Contests")
-                    st.info(f"**Active now: {len(running_contests)} contest(s)**")
+                    st.info(f"**Active now: {summary['counts']['running']} contest(s)**")
                    
                     # Show stats for running contests
                     stats_col1, stats_col2, stats_col3 = st.columns(3)
                    
                     with stats_col1:
-                        if camp_type_col and camp_type_col in running_contests.columns:
-                            running_types = running_contests[camp_type_col].nunique()
-                            st.metric("Campaign Types", running_types)
+                        if running_stats['types'] is not None:
+                            st.metric("Campaign Types", running_stats['types'])
                    
                     with stats_col2:
-                        if eligibility_col and eligibility_col in running_contests.columns:
-                            running_eligibilities = running_contests[eligibility_col].nunique()
-                            st.metric("Eligibility Types", running_eligibilities)
+                        if running_stats['eligibilities'] is not None:
+                            st.metric("Eligibility Types", running_stats['eligibilities'])
                    
                     with stats_col3:
-                        # Calculate average days left
-                        if end_date_col and end_date_col in running_contests.columns:
-                            try:
-                                days_left_list = []
-                                for _, row in running_contests.iterrows():
-                                    if pd.notna(row[end_date_col]):
-                                        if hasattr(row[end_date_col], 'date'):
-                                            end_date_obj = row[end_date_col].date()
-                                        else:
-                                            end_date_obj = pd.to_datetime(row[end_date_col]).date()
-                                        days_left = (end_date_obj - today).days
-                                        if days_left >= 0:
-                                            days_left_list.append(days_left)
-                               
-                                if days_left_list:
-                                    avg_days_left = sum(days_left_list) // len(days_left_list)
-                                    st.metric("Avg Days Left", avg_days_left)
-                                else:
-                                    st.metric("Avg Days Left", "N/A")
-                            except:
-                                st.metric("Avg Days Left", "N/A")
+                        if end_date_col:
+                            avg_days_left = running_stats['avg_days_left']
+                            st.metric("Avg Days Left", avg_days_left if avg_days_left is not None else "N/A")
                    
                     st.markdown("---")
                    
                     # Show running contest cards
-                    for _, row in running_contests.iterrows():
-                        card_html = create_contest_card(
-                            row, camp_name_col, camp_type_col, start_date_col, end_date_col,
-                            winner_date_col, kam_col, to_whom_col, eligibility_col, status='running'
-                        )
-                        st.markdown(card_html, unsafe_allow_html=True)
+                    render_contest_cards(
+                        dataset.contests_by_status(today, 'running'), columns, 'running', today,
+                        winner_lines=dataset.card_winner_lines()
+                    )
                 else:
                     st.subheader("🏃 Currently Running Contests")
                     st.info("🎉 No contests running today! All caught up!")
@@ -825,47 +798,31 @@ if client:
                 # ============================================
                 # UPCOMING CONTESTS
                 # ============================================
-                if not upcoming_contests.empty:
+                if summary['counts']['upcoming']:
                     st.subheader("📅 Upcoming Contests")
-                    st.info(f"**Scheduled: {len(upcoming_contests)} contest(s)**")
+                    st.info(f"**Scheduled: {summary['counts']['upcoming']} contest(s)**")
                    
-                    # Group by month for better organization
-                    upcoming_contests['Month_Year'] = upcoming_contests[start_date_col].dt.strftime('%B %Y')
-                    months_sorted = sorted(upcoming_contests['Month_Year'].unique(), 
-                                          key=lambda x: datetime.strptime(x, '%B %Y'))
-                    
-                    for month_year in months_sorted:
-                        month_contests = upcoming_contests[upcoming_contests['Month_Year'] == month_year]
-                        
-                        st.markdown(f"### 📅 {month_year}")
+                    # Grouped by month for better organization
+                    for month in summary['upcoming_months']:
+                        st.markdown(f"### 📅 {month['label']}")
                         
                         # Show stats for this month's contests
                         up_stats_col1, up_stats_col2 = st.columns(2)
                         
                         with up_stats_col1:
-                            # Days to next contest in this month
-                            try:
-                                next_contest_date = month_contests[start_date_col].min().date()
-                                days_to_next = (next_contest_date - today).days
-                                st.metric("Days to First Contest", days_to_next if days_to_next > 0 else 0)
-                            except:
-                                st.metric("Days to First Contest", "N/A")
+                            st.metric("Days to First Contest", month['days_to_first'])
                         
                         with up_stats_col2:
-                            # Contest eligibilities in this month
-                            if eligibility_col and eligibility_col in month_contests.columns:
-                                upcoming_eligibilities = month_contests[eligibility_col].nunique()
-                                st.metric("Eligibility Types", upcoming_eligibilities)
+                            if month['eligibilities'] is not None:
+                                st.metric("Eligibility Types", month['eligibilities'])
                         
                         st.markdown("---")
                         
                         # Show this month's contest cards
-                        for _, row in month_contests.iterrows():
-                            card_html = create_contest_card(
-                                row, camp_name_col, camp_type_col, start_date_col, end_date_col,
-                                winner_date_col, kam_col, to_whom_col, eligibility_col, status='upcoming'
-                            )
-                            st.markdown(card_html, unsafe_allow_html=True)
+                        render_contest_cards(
+                            contests.iloc[month['positions']], columns, 'upcoming', today,
+                            winner_lines=dataset.card_winner_lines()
+                        )
                         
                         st.markdown("<br>", unsafe_allow_html=True)
                 else:
@@ -875,7 +832,8 @@ if client:
                 # ============================================
                 # RECENTLY ENDED CONTESTS (FIXED FOR DARK MODE)
                 # ============================================
-                if not recently_ended.empty:
+                if len(summary['recently_ended']):
+                    recently_ended = contests.iloc[summary['recently_ended'][:9]]  # Show max 9
                     st.subheader("✅ Recently Ended Contests (Last 7 Days)")
                     
                     # Add a container with a class for styling
@@ -883,7 +841,7 @@ if client:
                     
                     # Show in a compact grid
                     cols = st.columns(3)
-                    for idx, (_, row) in enumerate(recently_ended.head(9).iterrows()):  # Show max 9
+                    for idx, (_, row) in enumerate(recently_ended.iterrows()):
                         with cols[idx % 3]:
                             camp_name = row[camp_name_col] if camp_name_col else 'N/A'
                             camp_type = row[camp_type_col] if camp_type_col else 'N/A'
@@ -910,6 +868,15 @@ if client:
                 else:
                     st.subheader("✅ Recently Ended Contests (Last 7 Days)")
                     st.info("No contests ended in the last 7 days")
+               
+                # Month and campaign type rollups from the same summary
+                with st.expander("📊 Contests by month and campaign type"):
+                    if not summary['by_month'].empty:
+                        st.markdown("**By start month**")
+                        st.dataframe(summary['by_month'], use_container_width=True)
+                    if not summary['by_type'].empty:
+                        st.markdown("**By campaign type**")
+                        st.dataframe(summary['by_type'], use_container_width=True)
        
         # ============================================
         # FILTER CONTESTS SECTION - FIXED DATE SELECTION
@@ -1004,89 +971,19 @@ if client:
                     else:
                         selected_type = "All Types"
                
-                # Apply filters - FIXED DATE FILTERING LOGIC
-                filtered_contests = contests.copy()
-               
-                # Debug: Show raw data for troubleshooting
-                debug_enabled = st.checkbox("🔧 Show debug info (for troubleshooting)", key="debug_checkbox")
-                if debug_enabled:
-                    st.write(f"Total contests: {len(contests)}")
-                    if start_date_col and start_date_col in contests.columns:
-                        st.write(f"Sample start dates (first 10):")
-                        sample_data = contests.head(10).copy()
-                        display_cols = []
-                        if camp_name_col: display_cols.append(camp_name_col)
-                        if start_date_col: display_cols.append(start_date_col)
-                        if end_date_col: display_cols.append(end_date_col)
-                        st.write(sample_data[display_cols])
-                       
-                        # Show data types
-                        st.write("**Date column data types:**")
-                        st.write(f"Start Date type: {type(contests[start_date_col].iloc[0]) if len(contests) > 0 else 'N/A'}")
-                        st.write(f"End Date type: {type(contests[end_date_col].iloc[0]) if len(contests) > 0 else 'N/A'}")
-                       
-                        # Show specific contest you mentioned
-                        target_contest = "CAMP-334434"
-                        if camp_name_col:
-                            specific_contest = contests[contests[camp_name_col].astype(str).str.contains(target_contest)]
-                            if not specific_contest.empty:
-                                st.write(f"**Specific contest ({target_contest}):**")
-                                st.write(specific_contest[[camp_name_col, start_date_col, end_date_col]])
-               
-                # Date range filter - FIXED
-                if start_date_col and end_date_col:
-                    # Make sure we have datetime objects
-                    if not pd.api.types.is_datetime64_any_dtype(filtered_contests[start_date_col]):
-                        filtered_contests[start_date_col] = safe_to_datetime(filtered_contests[start_date_col])
-                    if not pd.api.types.is_datetime64_any_dtype(filtered_contests[end_date_col]):
-                        filtered_contests[end_date_col] = safe_to_datetime(filtered_contests[end_date_col])
-                   
-                    # Filter by date range - FIXED LOGIC
-                    # We want contests that overlap with the selected date range
-                    date_mask = (
-                        # Contests that start within the range
-                        (
-                            (filtered_contests[start_date_col].dt.date >= start_date) &
-                            (filtered_contests[start_date_col].dt.date <= end_date)
-                        ) |
-                        # Contests that end within the range
-                        (
-                            (filtered_contests[end_date_col].dt.date >= start_date) &
-                            (filtered_contests[end_date_col].dt.date <= end_date)
-                        ) |
-                        # Contests that span the entire range
-                        (
-                            (filtered_contests[start_date_col].dt.date <= start_date) &
-                            (filtered_contests[end_date_col].dt.date >= end_date)
-                        )
+                # Apply filters - contests overlapping the selected range, then year/month/type
+                with timings.stage('filter', rows=len(contests)):
+                    filtered_contests = dataset.filter_contests(
+                        today, start_date, end_date,
+                        year=None if selected_year == "All Years" else selected_year,
+                        month_num=None if selected_month == "All Months" else months.index(selected_month),
+                        camp_type=None if selected_type == "All Types" else selected_type,
                     )
-                   
-                    # Apply the filter
-                    filtered_contests = filtered_contests[date_mask]
-               
-                # Year filter
-                if selected_year != "All Years" and 'Year' in filtered_contests.columns:
-                    filtered_contests = filtered_contests[filtered_contests['Year'] == int(selected_year)]
-               
-                # Month filter
-                if selected_month != "All Months" and 'Month_Num' in filtered_contests.columns:
-                    month_num = months.index(selected_month)
-                    filtered_contests = filtered_contests[filtered_contests['Month_Num'] == month_num]
-               
-                # Camp Type filter
-                if selected_type != "All Types" and camp_type_col and camp_type_col in filtered_contests.columns:
-                    filtered_contests = filtered_contests[filtered_contests[camp_type_col] == selected_type]
                
                 # Display results
                 st.subheader(f"📊 Results: {len(filtered_contests)} contests found")
                
                 if not filtered_contests.empty:
-                    # Calculate status for filtered contests
-                    filtered_contests['Status'] = filtered_contests.apply(
-                        lambda row: get_contest_status(row[start_date_col], row[end_date_col], today), 
-                        axis=1
-                    )
-                    
                     # Stats
                     col1, col2, col3 = st.columns(3)
                     with col1:
@@ -1098,50 +995,43 @@ if client:
                         upcoming_count = len(filtered_contests[filtered_contests['Status'] == 'upcoming'])
                         st.metric("Upcoming", upcoming_count)
                    
+                    # Columns for the table view and the download
+                    display_cols = [
+                        col for col in [camp_name_col, camp_type_col, eligibility_col, start_date_col,
+                                        end_date_col, winner_date_col, kam_col, to_whom_col]
+                        if col
+                    ]
+                   
                     # Show as cards or table based on toggle
                     view_mode = st.radio("View Mode:", ["Cards View", "Table View"], horizontal=True, key="contest_view")
                    
                     if view_mode == "Cards View":
                         st.markdown("---")
-                        for _, row in filtered_contests.iterrows():
-                            card_html = create_contest_card(
-                                row, camp_name_col, camp_type_col, start_date_col, end_date_col,
-                                winner_date_col, kam_col, to_whom_col, eligibility_col, status=row['Status']
-                            )
-                            st.markdown(card_html, unsafe_allow_html=True)
+                        render_contest_cards(
+                            filtered_contests, columns, filtered_contests['Status'], today,
+                            page_size=CARDS_PER_PAGE, key="contest_card_page",
+                            winner_lines=dataset.card_winner_lines()
+                        )
                     else:
                         # Table view
-                        display_cols = []
-                        if camp_name_col: display_cols.append(camp_name_col)
-                        if camp_type_col: display_cols.append(camp_type_col)
-                        if eligibility_col: display_cols.append(eligibility_col)
-                        if start_date_col: display_cols.append(start_date_col)
-                        if end_date_col: display_cols.append(end_date_col)
-                        if winner_date_col: display_cols.append(winner_date_col)
-                        if kam_col: display_cols.append(kam_col)
-                        if to_whom_col: display_cols.append(to_whom_col)
-                       
                         if display_cols:
-                            display_df = filtered_contests[display_cols + ['Status']].copy()
-                           
-                            # Format dates
-                            for date_col in [start_date_col, end_date_col, winner_date_col]:
-                                if date_col and date_col in display_df.columns:
-                                    display_df[date_col] = display_df[date_col].apply(
-                                        lambda x: x.strftime('%d-%m-%Y') if pd.notna(x) and hasattr(x, 'strftime') else str(x)
-                                    )
+                            # Format dates into a new frame, the filtered rows are shared
+                            display_df = filtered_contests[display_cols + ['Status']].assign(**{
+                                date_col: format_date_column(filtered_contests[date_col], '%d-%m-%Y')
+                                for date_col in [start_date_col, end_date_col, winner_date_col]
+                                if date_col
+                            })
                            
                             st.dataframe(display_df, use_container_width=True, height=400)
                    
-                    # Download button
+                    # Download, built only when asked for
                     if display_cols:
-                        csv = filtered_contests[display_cols + ['Status']].to_csv(index=False).encode('utf-8')
-                        st.download_button(
-                            "📥 Download Results",
-                            csv,
-                            f"contests_{start_date}_to_{end_date}.csv",
-                            "text/csv",
-                            key="contest_download"
+                        render_download(
+                            "📥 Download Results", "contest_download",
+                            (dataset.contest_fingerprint, today, start_date, end_date, selected_year, selected_month, selected_type),
+                            lambda: filtered_contests[display_cols + ['Status']],
+                            [start_date_col, end_date_col, winner_date_col],
+                            f"contests_{start_date}_to_{end_date}",
                         )
                 else:
                     st.info("No contests found for selected filters")
@@ -1164,7 +1054,7 @@ if client:
                         
                         if start_date_col in contests.columns:
                             st.write("**Sample dates from your sheet (first 5):**")
-                            sample_dates = contests.head(5).copy()
+                            sample_dates = contests.head(5)
                             display_sample = []
                             if camp_name_col: display_sample.append(camp_name_col)
                             if start_date_col: display_sample.append(start_date_col)
@@ -1228,54 +1118,27 @@ if client:
                         key="winner_end_date"
                     )
                
-                # Apply date filter to winners
-                filtered_winners = winners.copy()
-               
-                if 'Start Date' in filtered_winners.columns and 'End Date' in filtered_winners.columns:
-                    # Make sure dates are datetime
-                    if not pd.api.types.is_datetime64_any_dtype(filtered_winners['Start Date']):
-                        filtered_winners['Start Date'] = safe_to_datetime(filtered_winners['Start Date'])
-                    if not pd.api.types.is_datetime64_any_dtype(filtered_winners['End Date']):
-                        filtered_winners['End Date'] = safe_to_datetime(filtered_winners['End Date'])
-                    
-                    # Filter by date range (overlap)
-                    date_mask = (
-                        # Winners with contests starting in range
-                        (
-                            (filtered_winners['Start Date'].dt.date >= winner_start_date) &
-                            (filtered_winners['Start Date'].dt.date <= winner_end_date)
-                        ) |
-                        # Winners with contests ending in range
-                        (
-                            (filtered_winners['End Date'].dt.date >= winner_start_date) &
-                            (filtered_winners['End Date'].dt.date <= winner_end_date)
-                        ) |
-                        # Winners with contests spanning the range
-                        (
-                            (filtered_winners['Start Date'].dt.date <= winner_start_date) &
-                            (filtered_winners['End Date'].dt.date >= winner_end_date)
-                        )
-                    )
-                    filtered_winners = filtered_winners[date_mask]
+                # Apply date filter to winners - contests overlapping the selected range
+                with timings.stage('filter', rows=len(winners)):
+                    filtered_winners = dataset.winners_in_range(winner_start_date, winner_end_date)
                 
                 # Gift Status Statistics
                 st.subheader("📊 Gift Delivery Status (for selected date range)")
                 
                 if gift_status_col and gift_status_col in filtered_winners.columns:
-                    gift_stats = filtered_winners[gift_status_col].value_counts()
+                    delivered = int(is_delivered(filtered_winners[gift_status_col]).sum())
                     
                     col1, col2, col3, col4 = st.columns(4)
                     
                     with col1:
                         st.metric("Total Winners", len(filtered_winners))
                     with col2:
-                        delivered = gift_stats.get('Delivered', 0)
                         st.metric("Delivered", delivered)
                     with col3:
                         pending = len(filtered_winners) - delivered
                         st.metric("Pending", pending)
                     with col4:
-                        if 'Delivered' in gift_stats:
+                        if delivered:
                             delivery_rate = (delivered / len(filtered_winners)) * 100
                             st.metric("Delivery Rate", f"{delivery_rate:.1f}%")
                         else:
@@ -1283,6 +1146,36 @@ if client:
                 else:
                     st.metric("Total Winners", len(filtered_winners))
                 
+                # Delivery analytics over the full winner history, answered from cached rollups
+                analytics = dataset.gift_analytics()
+                if gift_status_col and analytics.dimensions:
+                    with st.expander("📈 Delivery Analytics (all winners)"):
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            group_by = st.selectbox("Group by", analytics.dimensions, key="analytics_group_by")
+                        with col2:
+                            drill_options = ["None"] + [dim for dim in analytics.dimensions if dim != group_by]
+                            drill_dim = st.selectbox("Drill into", drill_options, key="analytics_drill_dim")
+                        filters = {}
+                        with col3:
+                            if drill_dim != "None":
+                                drill_value = st.selectbox(
+                                    drill_dim, analytics.values(drill_dim), format_func=str, key="analytics_drill_value"
+                                )
+                                if drill_value is not None:
+                                    filters[drill_dim] = drill_value
+                        
+                        rollup = analytics.rollup(group_by, filters)
+                        table = rollup.rename(columns={
+                            'winners': 'Winners', 'delivered': 'Delivered',
+                            'pending': 'Pending', 'delivery_rate': 'Delivery Rate %',
+                        })
+                        table.index = table.index.astype(str)
+                        st.dataframe(table, use_container_width=True)
+                        
+                        st.markdown("**⏳ Pending gifts by days since winner announcement**")
+                        st.bar_chart(analytics.pending_ages(today, filters))
+                
                 st.markdown("---")
                 
                 # Winner search section
@@ -1330,97 +1223,43 @@ if client:
                 
                 # Process search
                 if search_input and search_col in filtered_winners.columns:
-                    # Clean and search within filtered winners
-                    filtered_winners[search_col] = filtered_winners[search_col].astype(str).fillna('')
-                    results = filtered_winners[filtered_winners[search_col].str.contains(search_input.strip(), case=False, na=False)]
+                    # Indexed lookup over all winners, then keep the ones in the selected date range
+                    with timings.stage('search', rows=len(filtered_winners)):
+                        results = dataset.search_winners(search_col, search_input, within=filtered_winners)
                    
                     if not results.empty:
                         st.success(f"✅ Found {len(results)} winner(s) in selected date range")
                        
-                        # Group by customer to show all contests they won
-                        if 'customer_firstname' in results.columns and 'businessid' in results.columns:
-                            grouped_results = results.groupby(['customer_firstname', 'businessid'])
-                           
-                            for (cust_name, bzid), group in grouped_results:
+                        # One page at a time in a grid, so any number of matches renders the same
+                        with timings.stage('render', rows=len(results)):
+                            page = paginate(results, "winner_results")
+                            table_cols = [col for col in WINNER_TABLE_COLUMNS + [gift_status_col] if col and col in page.columns]
+                            st.dataframe(
+                                page[table_cols].assign(**{
+                                    col: format_date_column(page[col], '%d-%m-%Y')
+                                    for col in WINNER_DATE_COLUMNS if col in table_cols
+                                }),
+                                hide_index=True, use_container_width=True
+                            )
+                       
+                        # Full details only for the customer picked from this page
+                        if 'customer_firstname' in page.columns and 'businessid' in page.columns:
+                            customers = page[['customer_firstname', 'businessid']].drop_duplicates()
+                            options = list(customers.itertuples(index=False, name=None))
+                            picked = st.selectbox(
+                                "🔎 Show all wins for", [None] + options, key="winner_detail",
+                                format_func=lambda c: "Select a winner..." if c is None else f"👤 {c[0]} (BZID: {c[1]})"
+                            )
+                            if picked is not None:
+                                cust_name, bzid = picked
+                                group = results[(results['customer_firstname'] == cust_name) & (results['businessid'] == bzid)]
                                 with st.expander(f"👤 {cust_name} (BZID: {bzid}) - {len(group)} win(s)", expanded=True):
-                                    for idx, (_, row) in enumerate(group.iterrows()):
+                                    for idx, (_, row) in enumerate(group.head(WINNER_DETAIL_LIMIT).iterrows()):
                                         st.markdown(f"---")
                                         st.markdown(f"**Win #{idx+1}**")
-                                       
-                                        col1, col2 = st.columns([2, 1])
-                                       
-                                        with col1:
-                                            # Contest Details
-                                            camp_desc = str(row.get('Camp Description', 'N/A')).strip()
-                                            contest_eligibility = str(row.get('Contest', 'N/A')).strip()
-                                            gift = str(row.get('Gift', 'N/A')).strip()
-                                           
-                                            # Get dates from winner data
-                                            start_date_val = row.get('Start Date', None)
-                                            end_date_val = row.get('End Date', None)
-                                            winner_date_val = row.get('Winner Announcement Date', None)
-                                           
-                                            # Format dates
-                                            start_date_str = 'N/A'
-                                            end_date_str = 'N/A'
-                                            winner_date_str = 'N/A'
-                                           
-                                            if pd.notna(start_date_val):
-                                                if hasattr(start_date_val, 'strftime'):
-                                                    start_date_str = start_date_val.strftime('%d-%m-%Y')
-                                                else:
-                                                    start_date_str = str(start_date_val)
-                                           
-                                            if pd.notna(end_date_val):
-                                                if hasattr(end_date_val, 'strftime'):
-                                                    end_date_str = end_date_val.strftime('%d-%m-%Y')
-                                                else:
-                                                    end_date_str = str(end_date_val)
-                                            
-                                            if pd.notna(winner_date_val):
-                                                if hasattr(winner_date_val, 'strftime'):
-                                                    winner_date_str = winner_date_val.strftime('%d-%m-%Y')
-                                                else:
-                                                    winner_date_str = str(winner_date_val)
-                                           
-                                            st.markdown(f"""
-                                            **Camp Description:** {camp_desc}  
-                                            **Eligibility:** {contest_eligibility}  
-                                            **Prize:** {gift}  
-                                            **Contest Duration:** {start_date_str} to {end_date_str}
-                                            """)
-                                       
-                                        with col2:
-                                            # Winner Details with Gift Status
-                                            winner_name = row.get('customer_firstname', 'N/A')
-                                            phone = row.get('customer_phonenumber', 'N/A')
-                                            store = row.get('business_displayname', 'N/A')
-                                            bzid_val = row.get('businessid', 'N/A')
-                                            
-                                            st.markdown(f"""
-                                            **Name:** {winner_name}  
-                                            **Phone:** {phone}  
-                                            **Store:** {store}  
-                                            **BZID:** {bzid_val}  
-                                            **Winner Date:** {winner_date_str}
-                                            """)
-                                            
-                                            # Display Gift Status with badge
-                                            if gift_status_col and gift_status_col in row:
-                                                gift_status_val = row[gift_status_col]
-                                                if pd.notna(gift_status_val) and str(gift_status_val).strip():
-                                                    gift_status_str = str(gift_status_val).strip()
-                                                    gift_status_lower = gift_status_str.lower()
-                                                    if 'delivered' in gift_status_lower:
-                                                        gift_status_class = "gift-delivered"
-                                                    elif 'pending' in gift_status_lower or 'not' in gift_status_lower:
-                                                        gift_status_class = "gift-pending"
-                                                    else:
-                                                        gift_status_class = "gift-not-found"
-                                                    
-                                                    st.markdown(f"**Gift Status:** <span class='{gift_status_class}'>{gift_status_str}</span>", unsafe_allow_html=True)
-                                                else:
-                                                    st.markdown("**Gift Status:** N/A")
+                                        render_win(row, gift_status_col, linked_contest(dataset, row))
+                                    if len(group) > WINNER_DETAIL_LIMIT:
+                                        st.caption(f"Showing the first {WINNER_DETAIL_LIMIT} of {len(group)} wins")
                     else:
                         st.warning("⚠️ No winners found for the search criteria in selected date range")
                 else:
@@ -1456,37 +1295,13 @@ if client:
                     st.markdown("---")
                     st.subheader("📥 Download Winners Data")
                     
-                    # Create a downloadable CSV
-                    download_cols = [
-                        'Camp Description', 'Contest', 'Gift', 'Start Date', 'End Date',
-                        'businessid', 'customer_customerid', 'customer_phonenumber',
-                        'customer_firstname', 'business_displayname', 'address_addresslocality',
-                        'Winner Announcement Date'
-                    ]
-                    
-                    # Add Gift Status column if available
-                    if gift_status_col and gift_status_col in filtered_winners.columns:
-                        download_cols.append(gift_status_col)
-                    
-                    # Filter to only available columns
-                    available_cols = [col for col in download_cols if col in filtered_winners.columns]
-                    download_df = filtered_winners[available_cols].copy()
-                    
-                    # Format dates for download
-                    for date_col in ['Start Date', 'End Date', 'Winner Announcement Date']:
-                        if date_col in download_df.columns:
-                            download_df[date_col] = download_df[date_col].apply(
-                                lambda x: x.strftime('%d-%m-%Y') if pd.notna(x) and hasattr(x, 'strftime') else str(x)
-                            )
-                    
-                    csv_data = download_df.to_csv(index=False).encode('utf-8')
-                    
-                    st.download_button(
-                        "📥 Download Winners List",
-                        csv_data,
-                        f"winners_{winner_start_date}_to_{winner_end_date}.csv",
-                        "text/csv",
-                        key="winners_download"
+                    # Built only when asked for, not on every rerun
+                    render_download(
+                        "📥 Download Winners List", "winners_download",
+                        (dataset.winner_fingerprint, winner_start_date, winner_end_date),
+                        lambda: winner_export_frame(filtered_winners, gift_status_col),
+                        WINNER_DATE_COLUMNS,
+                        f"winners_{winner_start_date}_to_{winner_end_date}",
                     )
             else:
                 st.warning("No winner data available")
@@ -1495,14 +1310,41 @@ if client:
         st.error(f"Error: {str(e)}")
        
 else:
-    st.error("Connection failed")
+    st.error(f"Connection failed: {str(refresher.last_error)[:100]}" if refresher.last_error else "Connection failed")
 
 # ============================================
 # FOOTER
 # ============================================
 st.sidebar.markdown("---")
-st.sidebar.caption(f"Last updated: {datetime.now().strftime('%d %b %Y %H:%M')}")
+if loaded and loaded['loaded_at']:
+    loaded_at = loaded['loaded_at']
+    if isinstance(loaded_at, str):
+        loaded_at = datetime.fromisoformat(loaded_at)
+    st.sidebar.caption(f"Last updated: {loaded_at.strftime('%d %b %Y %H:%M')}")
+if refresher.refreshing:
+    st.sidebar.caption("🔄 Refreshing from Google Sheets...")
 
+# Reloads in the background; this and every other session keep the current data until it lands
 if st.sidebar.button("🔄 Refresh Data"):
-    st.cache_data.clear()
-    st.rerun()
+    # A manual refresh re-reads whole sheets, so edits to any row show up
+    refresher.refresh(full=True)
+    st.sidebar.info("Full reload started - new data shows up on your next interaction")
+
+# Stage timings: logged on every rerun, shown on request
+get_stage_log().write(timings)
+if st.sidebar.checkbox("⏱️ Show stage timings", key="stage_timings"):
+    stage_log = get_stage_log()
+    for kind, title in [('rerun', "This rerun"), ('refresh', "Last Sheets refresh")]:
+        rows = timings.rows() if kind == 'rerun' else stage_log.latest.get(kind)
+        if rows:
+            st.sidebar.markdown(f"**{title}**")
+            st.sidebar.dataframe(
+                pd.DataFrame(rows)[['stage', 'seconds', 'rows', 'mem_delta_mb']],
+                hide_index=True, use_container_width=True
+            )
+    if loaded:
+        builds = loaded['value'].build_counters()
+        st.sidebar.caption(
+            f"Index builds: {builds['executed']} run, {builds['coalesced']} shared with one in flight"
+        )
+    st.sidebar.caption(f"Logged to {stage_log.path}")
@@ -0,0 +1,171 @@
+"""Time each stage of the contest/winner data pipeline on synthetic sheets
+
+Runs without Streamlit or network access. Example:
+
+    python benchmarks/bench_pipeline.py --sizes 1000 10000 --output bench.json
+
+Every result is one JSON object (stage, rows, seconds, rows_per_sec,
+peak_mb); --output appends them as JSON lines tagged with the git commit so
+runs from different commits can be compared.
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contest_core  # noqa: E402
+from contest_core import (  # noqa: E402
+    safe_to_datetime, compute_contest_status, prepare_contest_data, prepare_winner_data,
+    build_contest_cards, compact_dtypes, CardCache,
+)
+from campaign_index import CampaignWinnerIndex  # noqa: E402
+from date_index import DateRangeIndex  # noqa: E402
+from exports import export_winners_csv  # noqa: E402
+from gift_analytics import GiftAnalytics  # noqa: E402
+from search_index import WinnerSearchIndex  # noqa: E402
+from synthetic import make_contests, make_winners  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+# Fixed "today" so status and days-left work is the same on every run
+BENCH_TODAY = date(2024, 6, 15)
+
+
+# Function to time one stage and measure its peak memory
+def measure(stage, rows, fn, repeat=1):
+    """Best wall time over repeat runs, then one traced run for peak memory
+
+    tracemalloc slows Python-heavy code down a lot, so it is kept out of the
+    timed runs.
+    """
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'stage': stage,
+        'rows': rows,
+        'seconds': round(best, 6),
+        'rows_per_sec': round(rows / best, 1) if best else None,
+        'peak_mb': round(peak / 2 ** 20, 3),
+    }
+
+
+# Function to run every stage for one dataset size
+def run_size(n, repeat=1):
+    contests_raw = make_contests(n)
+    winners_raw = make_winners(n)
+
+    def parse_cold():
+        contest_core._date_memo.clear()
+        safe_to_datetime(contests_raw['Start Date'])
+
+    results = [
+        measure('parse_dates_cold', n, parse_cold, repeat),
+        measure('parse_dates_warm', n, lambda: safe_to_datetime(contests_raw['Start Date']), repeat),
+        measure('prepare_contests', n, lambda: prepare_contest_data(contests_raw), repeat),
+        measure('prepare_winners', n, lambda: prepare_winner_data(winners_raw), repeat),
+        measure('compact_winners', n, lambda: compact_dtypes(winners_raw), repeat),
+    ]
+
+    contests, columns = prepare_contest_data(contests_raw)
+    winners, winner_columns = prepare_winner_data(winners_raw)
+    start_col, end_col = columns['start_date'], columns['end_date']
+
+    results.append(measure('status', n, lambda: compute_contest_status(contests, start_col, end_col, BENCH_TODAY), repeat))
+    status = compute_contest_status(contests, start_col, end_col, BENCH_TODAY)
+
+    results.append(measure('overlap_index_build', n, lambda: DateRangeIndex(winners['Start Date'], winners['End Date']), repeat))
+    range_index = DateRangeIndex(winners['Start Date'], winners['End Date'])
+    results.append(measure('overlap_query', n, lambda: range_index.overlapping(date(2024, 5, 1), date(2024, 6, 30)), repeat))
+
+    search_modes = {
+        'businessid': 'id', 'customer_phonenumber': 'phone',
+        'customer_firstname': 'text', winner_columns['gift_status']: 'category',
+    }
+    results.append(measure('search_index_build', n, lambda: WinnerSearchIndex(winners, search_modes), repeat))
+    search_index = WinnerSearchIndex(winners, search_modes)
+    queries = [
+        ('businessid', winners['businessid'].iloc[n // 2]),
+        ('customer_phonenumber', str(winners['customer_phonenumber'].iloc[n // 3])),
+        ('customer_firstname', 'ram'),
+        (winner_columns['gift_status'], 'pending'),
+    ]
+    results.append(measure('search_query', len(queries), lambda: [search_index.search(col, q) for col, q in queries], repeat))
+
+    results.append(measure('campaign_join', n, lambda: CampaignWinnerIndex(
+        contests[columns['camp_name']], winners['Camp Description'], winners[winner_columns['gift_status']], winners['Gift']
+    ), repeat))
+    analytics = GiftAnalytics(winners, winner_columns['gift_status'])
+    results.append(measure('gift_cube', n, lambda: GiftAnalytics(winners, winner_columns['gift_status']), repeat))
+
+    def gift_rollups():
+        # Every single-dimension pivot, uncached
+        analytics._cache.clear()
+        return [analytics.rollup(dim) for dim in analytics.dimensions]
+
+    results.append(measure('gift_rollup', n, gift_rollups, repeat))
+
+    results.append(measure('cards_batch', n, lambda: build_contest_cards(contests, columns, status, BENCH_TODAY), repeat))
+    card_cache = CardCache(maxsize=n)
+    build_contest_cards(contests, columns, status, BENCH_TODAY, cache=card_cache)
+    results.append(measure('cards_cached', n, lambda: build_contest_cards(
+        contests, columns, status, BENCH_TODAY, cache=card_cache
+    ), repeat))
+    results.append(measure('export_csv', n, lambda: export_winners_csv(winners, winner_columns['gift_status']), repeat))
+    return results
+
+
+# Function to find the commit being measured
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='row counts to generate')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per stage, the best time is kept')
+    parser.add_argument('--output', help='append results as JSON lines to this file')
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    run_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+    out = open(args.output, 'a', encoding='utf-8') if args.output else None
+    try:
+        print(f"{'stage':<22}{'rows':>10}{'seconds':>12}{'rows/sec':>14}{'peak MB':>10}")
+        for n in args.sizes:
+            for result in run_size(n, args.repeat):
+                result.update(commit=commit, run_at=run_at, size=n)
+                print(f"{result['stage']:<22}{result['rows']:>10}{result['seconds']:>12.4f}"
+                      f"{result['rows_per_sec'] or 0:>14.0f}{result['peak_mb']:>10.2f}")
+                if out:
+                    out.write(json.dumps(result) + '\n')
+    finally:
+        if out:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
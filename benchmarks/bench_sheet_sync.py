@@ -0,0 +1,184 @@
+"""Check IncrementalSheetSync against a local fake worksheet
+
+Runs without Streamlit or network access. Example:
+
+    python benchmarks/bench_sheet_sync.py --rows 2000
+
+Each scenario changes the fake sheet (append, edit, insert, delete,
+re-sort, rows with a blank column A, Gift Status on an old row, another
+cell of an old row followed by a manual full refresh), syncs, and compares
+the local copy with what get_all_records() would return. Cell conversion
+is checked against gspread's numericise when gspread is installed. It
+prints the sync stats and the cells fetched, and exits non-zero on any
+mismatch.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sheet_sync import IncrementalSheetSync, numericise  # noqa: E402
+
+HEADER = ['Camp Name', 'Camp Type', 'Start Date', 'End Date', 'BZID', 'Gift Status']
+
+# Columns the sync reads in full on every refresh, as the app configures it
+WATCH = {'gift_status': ['Gift Status']}
+
+
+def _column_number(letters):
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - 64
+    return number
+
+
+class FakeWorksheet:
+    """Stand-in for a gspread worksheet, answering from a list of rows
+
+    Like the Sheets API, col_values stops at the last non-blank cell and
+    ranges drop trailing empty rows and cells.
+    """
+
+    def __init__(self, header, rows):
+        self.header = list(header)
+        self.rows = [list(row) for row in rows]
+        self.cells_fetched = 0
+
+    def _trim(self, rows):
+        rows = [list(row) for row in rows]
+        for row in rows:
+            while row and row[-1] == '':
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def row_values(self, row):
+        return self._trim([([self.header] + self.rows)[row - 1]])[0] if row <= len(self.rows) + 1 else []
+
+    def col_values(self, col):
+        values = [row[col - 1] if col <= len(row) else '' for row in [self.header] + self.rows]
+        while values and values[-1] == '':
+            values.pop()
+        self.cells_fetched += len(values)
+        return values
+
+    def batch_get(self, ranges):
+        results = []
+        grid = [self.header] + self.rows
+        for a1 in ranges:
+            first_col, first_row, last_col, last_row = re.fullmatch(r'([A-Z]+)(\d+):([A-Z]+)(\d*)', a1).groups()
+            first_row, last_row = int(first_row), int(last_row) if last_row else len(grid)
+            first_col, last_col = _column_number(first_col), _column_number(last_col)
+            block = self._trim([row[first_col - 1:last_col] for row in grid[first_row - 1:last_row]])
+            self.cells_fetched += sum(len(row) for row in block)
+            results.append(block)
+        return results
+
+    def get_all_records(self):
+        width = len(self.header)
+        rows = self._trim(self.rows)
+        return [dict(zip(self.header, map(numericise, row + [''] * (width - len(row))))) for row in rows]
+
+
+# (cell text, value get_all_records gives for it)
+NUMERICISE_CASES = [
+    ('1234', 1234), ('1,234', 1234), ('1,234.5', 1234.5), ('-7', -7), ('0.25', 0.25),
+    ('', ''), ('BZ001234', 'BZ001234'), ('1_000', '1_000'), ('01-02-2024', '01-02-2024'),
+    ('9876543210', 9876543210), ('Delivered', 'Delivered'),
+]
+
+
+# Function to check cell conversion against gspread
+def check_numericise():
+    """Return the number of cases where numericise differs from the expected or gspread's value"""
+    try:
+        from gspread.utils import numericise as gspread_numericise
+    except ImportError:
+        gspread_numericise = None
+    failures = 0
+    for text, expected in NUMERICISE_CASES:
+        got = numericise(text)
+        reference = gspread_numericise(text) if gspread_numericise else expected
+        if got != expected or got != reference or type(got) is not type(reference):
+            print(f"numericise({text!r}) = {got!r}, expected {expected!r} (gspread {reference!r})")
+            failures += 1
+    print(f"{'numericise':>22}: {len(NUMERICISE_CASES)} cases, "
+          f"{'checked against gspread' if gspread_numericise else 'gspread not installed'}, "
+          f"{'ok' if not failures else 'MISMATCH'}")
+    return failures
+
+
+def make_row(i):
+    return [f'CAMP-{i:06d}', random.choice(['Volume', 'Streak', 'Referral']),
+            f'{1 + i % 28:02d}-01-2024', f'{1 + i % 28:02d}-03-2024', f'BZ{i:06d}',
+            random.choice(['Pending', 'Delivered'])]
+
+
+def scenarios(rows):
+    """(name, change to apply to the fake sheet, full refresh) in the order they run"""
+    def append(ws):
+        ws.rows.extend(make_row(rows + i) for i in range(25))
+
+    def edit(ws):
+        ws.rows[-3][1] = 'Edited'
+
+    def insert(ws):
+        ws.rows.insert(len(ws.rows) // 2, make_row(10 * rows))
+
+    def delete(ws):
+        del ws.rows[len(ws.rows) // 3]
+
+    def delete_last(ws):
+        del ws.rows[-2:]
+
+    def resort(ws):
+        ws.rows.sort(key=lambda row: row[4], reverse=True)
+
+    def blank_column_a(ws):
+        ws.rows.extend(['', 'Volume', '01-05-2024', '31-05-2024', f'BZ-NOCAMP-{i}', 'Pending'] for i in range(3))
+
+    def old_gift_status(ws):
+        # Ops marking gifts from weeks back as delivered
+        for pos in (9, 10, 11, 500):
+            ws.rows[pos][5] = 'Delivered on 02-06-2024'
+
+    def old_row_other_column(ws):
+        ws.rows[9][3] = '30-04-2024'
+
+    return [('append', append, False), ('edit', edit, False), ('insert', insert, False),
+            ('delete', delete, False), ('delete last rows', delete_last, False), ('re-sort', resort, False),
+            ('append blank column A', blank_column_a, False), ('old gift status', old_gift_status, False),
+            ('old row, manual full', old_row_other_column, True), ('no change', lambda ws: None, False)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+
+    worksheet = FakeWorksheet(HEADER, [make_row(i) for i in range(args.rows)])
+    failures = check_numericise()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # full_sync_every=0: only the sync's own checks may fall back to a full read
+        sync = IncrementalSheetSync('Winners Details', cache_dir=cache_dir, full_sync_every=0, watch=WATCH)
+        for name, change, full in [('initial', lambda ws: None, False)] + scenarios(args.rows):
+            change(worksheet)
+            worksheet.cells_fetched = 0
+            records = sync.sync(worksheet, full=full)
+            ok = records == worksheet.get_all_records()
+            failures += not ok
+            stats = sync.last_stats
+            print(f"{name:>22}: {stats['mode']:<11} rows={stats['rows']} appended={stats['appended']} "
+                  f"changed={stats['changed']} cells={worksheet.cells_fetched} {'ok' if ok else 'MISMATCH'}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
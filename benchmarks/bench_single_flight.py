@@ -0,0 +1,79 @@
+"""Check that sessions share one build of each lazily built dataset index
+
+Runs without Streamlit or network access. Example:
+
+    python benchmarks/bench_single_flight.py --rows 200000 --sessions 20
+
+ContestDataset builds its winner search and date-range indexes on first
+use. Each round prepares a fresh dataset from synthetic sheets, then starts
+--sessions threads that all search winners and filter them by date at once,
+like sessions arriving right after a refresh. build_counters() should show
+each index built once per round and every other request coalesced, and all
+sessions should get the same rows.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contest_core import ContestDataset  # noqa: E402
+from synthetic import make_contests, make_winners  # noqa: E402
+
+# Winners whose contest overlaps this range, as the Winner Search date filter asks
+RANGE = (date(2024, 5, 1), date(2024, 6, 30))
+
+
+def run_round(dataset, bzid, sessions):
+    """Search and date-filter from sessions threads at once, returns (seconds, per-session row counts)"""
+    start = threading.Barrier(sessions)
+    results = [None] * sessions
+
+    def session(i):
+        start.wait()
+        # Sessions land on different pages, so they ask for the indexes in different orders
+        if i % 2 == 0:
+            found = len(dataset.search_winners('businessid', bzid))
+            in_range = len(dataset.winners_in_range(*RANGE))
+        else:
+            in_range = len(dataset.winners_in_range(*RANGE))
+            found = len(dataset.search_winners('businessid', bzid))
+        results[i] = (found, in_range)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000, help='synthetic winners per round')
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    contests, winners = make_contests(max(1000, args.rows // 50)), make_winners(args.rows)
+    failed = False
+    for round_no in range(1, args.rounds + 1):
+        # A refresh brings a new dataset whose indexes are built again on first use
+        dataset = ContestDataset.from_frames(contests, winners)
+        bzid = dataset.winners['businessid'].iloc[len(dataset.winners) // 2]
+        seconds, results = run_round(dataset, bzid, args.sessions)
+        counters = dataset.build_counters()
+        ok = len(set(results)) == 1 and results[0][0] > 0 and counters['executed'] == 2
+        failed |= not ok
+        print(f"round {round_no}: {args.sessions} sessions in {seconds:.2f}s, "
+              f"rows (found, in range) {results[0]}, {'ok' if ok else 'MISMATCH'}, "
+              + ' '.join(f"{name}={value}" for name, value in counters.items()))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# Share of rows written in each date format - mostly DD-MM-YYYY like the real sheets
+DATE_FORMAT_MIX = [
+    ('%d-%m-%Y', 0.80),
+    ('%d/%m/%Y', 0.10),
+    ('%Y-%m-%d', 0.05),
+    ('%d %b %Y', 0.03),
+    ('', 0.02),  # blank cells
+]
+
+CAMP_TYPES = ['Scheme', 'Slab', 'Lucky Draw', 'Loyalty', 'Festive', 'Launch']
+ELIGIBILITIES = ['All Retailers', 'Gold Tier', 'Silver Tier', 'New Customers', 'Kirana Only']
+KAMS = ['Arjun', 'Meera', 'Ravi', 'Sneha', 'Vikram', 'Divya', 'Karthik']
+TEAMS = ['Sales', 'Category', 'Marketing', 'Ops']
+GIFTS = ['Smartphone', 'Gold Coin', 'Mixer Grinder', 'Voucher 500', 'Voucher 1000', 'Smart Watch', 'Pressure Cooker']
+GIFT_STATUSES = ['Delivered', 'Pending', 'Not Delivered', 'Dispatched']
+LOCALITIES = ['Jayanagar', 'Whitefield', 'Yelahanka', 'Hebbal', 'BTM Layout', 'Banashankari', 'Malleshwaram', 'Peenya']
+FIRST_NAMES = ['Ramesh', 'Suresh', 'Anita', 'Kumar', 'Priya', 'Mohammed', 'Lakshmi', 'Ganesh', 'Farida', 'Raju',
+               'Manjunath', 'Shobha', 'Imran', 'Kavya', 'Naveen', 'Zoya', 'Basavaraj', 'Asha']
+
+
+# Function to write dates as text in the mixed formats the sheets contain
+def _date_strings(dates, rng):
+    formats = [fmt for fmt, _ in DATE_FORMAT_MIX]
+    weights = [share for _, share in DATE_FORMAT_MIX]
+    chosen = rng.choice(len(formats), size=len(dates), p=weights)
+    out = np.empty(len(dates), dtype=object)
+    for i, fmt in enumerate(formats):
+        mask = chosen == i
+        out[mask] = dates[mask].strftime(fmt) if fmt else ''
+    return out
+
+
+# Function to pick random contest spans
+def _spans(n, rng, first='2022-01-01', days=1500):
+    start = pd.DatetimeIndex(pd.Timestamp(first) + pd.to_timedelta(rng.integers(0, days, n), unit='D'))
+    end = start + pd.to_timedelta(rng.integers(3, 45, n), unit='D')
+    winner = end + pd.to_timedelta(rng.integers(1, 15, n), unit='D')
+    return start, end, winner
+
+
+# Function to build a synthetic "Contest Details" sheet
+def make_contests(n, seed=0):
+    """Return n rows shaped like get_all_records() on the Contest Details sheet"""
+    rng = np.random.default_rng(seed)
+    start, end, winner = _spans(n, rng)
+    return pd.DataFrame({
+        'Camp Name': [f'CAMP-{300000 + i}' for i in range(n)],
+        'Camp Type': rng.choice(CAMP_TYPES, n),
+        'Contest Eligiblity': rng.choice(ELIGIBILITIES, n),
+        'Start Date': _date_strings(start, rng),
+        'End Date': _date_strings(end, rng),
+        'Winner Announcement Date': _date_strings(winner, rng),
+        'KAM': rng.choice(KAMS, n),
+        'To Whom?': rng.choice(TEAMS, n),
+    })
+
+
+# Function to build a synthetic "Winners Details" sheet
+def make_winners(n, seed=1, campaigns=None):
+    """Return n rows shaped like get_all_records() on the Winners Details sheet"""
+    rng = np.random.default_rng(seed)
+    campaigns = campaigns or max(10, n // 50)
+    # Winners of the same campaign share its dates, like the real sheet
+    camp = rng.integers(0, campaigns, n)
+    start, end, winner = _spans(campaigns, rng)
+    start_text = _date_strings(start, rng)
+    end_text = _date_strings(end, rng)
+    winner_text = _date_strings(winner, rng)
+    customers = rng.integers(0, max(1, n // 3), n)
+    return pd.DataFrame({
+        'Camp Description': [f'CAMP-{300000 + c}' for c in camp],
+        'Camp Type': np.array(CAMP_TYPES, dtype=object)[camp % len(CAMP_TYPES)],
+        'Contest': rng.choice(ELIGIBILITIES, n),
+        'Gift': rng.choice(GIFTS, n),
+        'Start Date': start_text[camp],
+        'End Date': end_text[camp],
+        'businessid': [f'BZID-{1300000000 + c}' for c in customers],
+        'customer_customerid': customers + 500000,
+        'customer_phonenumber': 6000000000 + customers * 37 % 3999999999,
+        'customer_firstname': rng.choice(FIRST_NAMES, n),
+        'business_displayname': [f'Store {c}' for c in customers],
+        'address_addresslocality': rng.choice(LOCALITIES, n),
+        'Winner Announcement Date': winner_text[camp],
+        'Gift Status': rng.choice(GIFT_STATUSES, n, p=[0.6, 0.25, 0.05, 0.1]),
+    })
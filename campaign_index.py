@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from schema import normalize_header
+from search_index import normalize_search_value
+
+# Gifts listed on a contest card, most given first
+TOP_GIFTS = 3
+
+
+# Function to turn campaign names into join keys
+def campaign_keys(series):
+    """Normalized campaign names ('' for blanks), worked out once per distinct value
+
+    'CAMP-300123', 'camp 300123 ' and 'Camp_300123' all give the same key.
+    """
+    codes, uniques = pd.factorize(series)
+    keys = np.array([normalize_header(value) for value in uniques] + [''], dtype=object)
+    return pd.Series(keys[codes], index=series.index)
+
+
+# Function to flag delivered gifts
+def is_delivered(series):
+    """Boolean array, True where the gift status reads 'Delivered' (any case/spacing)"""
+    codes, uniques = pd.factorize(series)
+    flags = np.array([normalize_search_value(value) == 'delivered' for value in uniques] + [False], dtype=bool)
+    return flags[codes]
+
+
+class CampaignWinnerIndex:
+    """Winners of each campaign, joined to the contest rows that share its name
+
+    Contests are matched on their campaign name and winners on Camp
+    Description, both normalized with campaign_keys(). Counts, the
+    delivered/pending split and top gifts are worked out once per campaign, so
+    a contest's figures are a lookup by its row label.
+    """
+
+    def __init__(self, contest_names, winner_names, gift_status=None, gifts=None):
+        winner_keys = campaign_keys(winner_names).to_numpy()
+        frame = pd.DataFrame({
+            'key': winner_keys,
+            'delivered': is_delivered(gift_status) if gift_status is not None else np.zeros(len(winner_keys), dtype=bool),
+            'gift': gifts.to_numpy(dtype=object) if gifts is not None else None,
+        })
+        frame = frame[frame['key'] != '']
+
+        grouped = frame.groupby('key', sort=False)
+        stats = pd.DataFrame({'winners': grouped.size(), 'delivered': grouped['delivered'].sum()})
+        stats['pending'] = stats['winners'] - stats['delivered']
+        stats['top_gifts'] = ''
+        if gifts is not None and len(frame):
+            gift_counts = frame.dropna(subset=['gift']).groupby(['key', 'gift'], sort=False).size()
+            gift_counts = gift_counts.reset_index(name='count').sort_values(['key', 'count'], ascending=[True, False], kind='stable')
+            top = gift_counts.groupby('key', sort=False).head(TOP_GIFTS).groupby('key', sort=False)['gift']
+            stats['top_gifts'] = top.agg(lambda names: ', '.join(map(str, names))).reindex(stats.index, fill_value='')
+        self.stats = stats
+
+        # Per contest row label; contests without winners get zeros
+        contest_keys = campaign_keys(contest_names)
+        self.by_contest = stats.reindex(contest_keys.to_numpy()).set_axis(contest_names.index)
+        self.by_contest[['winners', 'delivered', 'pending']] = (
+            self.by_contest[['winners', 'delivered', 'pending']].fillna(0).astype(int)
+        )
+        self.by_contest['top_gifts'] = self.by_contest['top_gifts'].fillna('')
+
+        # First contest row of each campaign, for going from a winner back to its contest
+        first = ~contest_keys.duplicated() & (contest_keys != '')
+        self.contest_labels = dict(zip(contest_keys[first], contest_names.index[first.to_numpy()]))
+
+    def contest_label(self, campaign_name):
+        """Row label of the contest with this campaign name, or None"""
+        return self.contest_labels.get(normalize_header(campaign_name)) if pd.notna(campaign_name) else None
@@ -0,0 +1,744 @@
+"""UI-free contest/winner pipeline: parsing, status, filtering, search and card HTML
+
+Nothing here imports Streamlit or gspread, so batch jobs, benchmarks and
+other frontends can use it directly:
+
+    dataset = ContestDataset.from_records(contest_records, winner_records)
+    running = dataset.contests_with_status(date.today()).query("Status == 'running'")
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from campaign_index import CampaignWinnerIndex
+from date_index import DateRangeIndex
+from gift_analytics import GiftAnalytics
+from schema import CONTEST_COLUMNS, WINNER_COLUMNS, REQUIRED_CONTEST_COLUMNS, resolve_columns
+from search_index import WinnerSearchIndex
+from single_flight import SingleFlight
+
+# Date formats seen in the sheets, in order of likelihood
+DATE_FORMATS = [
+    '%d-%m-%Y',  # DD-MM-YYYY (your format)
+    '%d/%m/%Y',  # DD/MM/YYYY
+    '%Y-%m-%d',  # YYYY-MM-DD
+    '%d %b %Y',  # DD MMM YYYY
+    '%d %B %Y',  # DD Month YYYY
+    '%m/%d/%Y',  # MM/DD/YYYY
+    '%d-%m-%y',  # DD-MM-YY
+    '%d/%m/%y',  # DD/MM/YY
+]
+DATE_SNIFF_SAMPLE = 200
+DATE_MEMO_LIMIT = 100000
+
+# Parsed date strings shared across calls: (string, format order) -> (datetime64, format used)
+_date_memo = {}
+_date_memo_lock = threading.Lock()
+
+# Function to order date formats by how well they match a sample
+def sniff_date_formats(values, sample_size=DATE_SNIFF_SAMPLE):
+    """Return DATE_FORMATS ordered by hits on a sample, most common first"""
+    sample = pd.Series(values[:sample_size], dtype=object)
+    hits = {}
+    for fmt in DATE_FORMATS:
+        try:
+            hits[fmt] = int(pd.to_datetime(sample, errors='coerce', format=fmt).notna().sum())
+        except:
+            hits[fmt] = 0
+    # sorted() is stable, so ties keep the order of DATE_FORMATS
+    return sorted(DATE_FORMATS, key=lambda fmt: -hits[fmt])
+
+# Function to parse a batch of unique date strings
+def _parse_unique_dates(values, formats=None):
+    """Parse unique strings with the dominant format first, then the residuals"""
+    values = pd.Series(values, dtype=object)
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    used = pd.Series(None, index=values.index, dtype=object)
+    
+    for fmt in formats or sniff_date_formats(values.values):
+        todo = parsed.isna()
+        if not todo.any():
+            break
+        try:
+            attempt = pd.to_datetime(values[todo], errors='coerce', format=fmt)
+        except:
+            continue
+        ok = attempt.notna()
+        parsed[ok[ok].index] = attempt[ok].astype('datetime64[ns]')
+        used[ok[ok].index] = fmt
+    
+    # Whatever is left goes through pandas' own parser with dayfirst=True
+    for idx in parsed.index[parsed.isna()]:
+        fallback = pd.to_datetime(values[idx], errors='coerce', dayfirst=True)
+        if not pd.isna(fallback):
+            parsed[idx] = fallback
+            used[idx] = 'dayfirst'
+    
+    return parsed.values, used.values
+
+# Function to parse dates and report which formats matched
+def parse_dates_with_stats(series):
+    """Convert series to datetime64, returning (dates, per-format row hit counts)"""
+    # First, ensure we're working with strings
+    str_series = series.astype(str).str.strip()
+    
+    # Remove common issues
+    str_series = str_series.where(~str_series.isin(['NaT', 'NaN', 'nan', 'None', '<NA>', '']))
+    
+    # Only unique strings are parsed - sheets repeat the same few hundred dates
+    codes, uniques = pd.factorize(str_series)
+    uniques = list(uniques)
+    # Ambiguous strings like 03/04/2024 parse by the format order sniffed for
+    # this column, so memo entries are only reused under the same order
+    formats = tuple(sniff_date_formats(uniques))
+    found = {}
+    missing = []
+    for value in uniques:
+        entry = _date_memo.get((value, formats))
+        if entry is None:
+            missing.append(value)
+        else:
+            found[value] = entry
+    if missing:
+        parsed, used = _parse_unique_dates(missing, formats)
+        fresh = dict(zip(missing, zip(parsed, used)))
+        found.update(fresh)
+        with _date_memo_lock:
+            if len(_date_memo) + len(fresh) > DATE_MEMO_LIMIT:
+                _date_memo.clear()
+            _date_memo.update(((value, formats), entry) for value, entry in fresh.items())
+    
+    # Built from this call's own hits and parses, so a concurrent clear can't drop any
+    memo = [found[value] for value in uniques]
+    unique_dates = pd.DatetimeIndex([entry[0] for entry in memo], dtype='datetime64[ns]')
+    unique_formats = [entry[1] for entry in memo]
+    
+    if len(unique_dates):
+        values = unique_dates.take(codes, allow_fill=True, fill_value=pd.NaT)
+    else:
+        values = pd.DatetimeIndex([pd.NaT] * len(series), dtype='datetime64[ns]')
+    result = pd.Series(values, index=series.index, dtype='datetime64[ns]')
+    
+    hits = {}
+    if len(unique_formats):
+        row_counts = pd.Series(codes[codes >= 0]).value_counts()
+        for code, count in row_counts.items():
+            fmt = unique_formats[code] if isinstance(unique_formats[code], str) else 'unparsed'
+            hits[fmt] = hits.get(fmt, 0) + int(count)
+    return result, hits
+
+# Function to safely convert to datetime - IMPROVED for DD-MM-YYYY format
+def safe_to_datetime(series):
+    """Safely convert series to datetime with multiple format attempts"""
+    try:
+        result, _ = parse_dates_with_stats(series)
+        return result
+    except Exception as e:
+        return pd.NaT
+
+# Contest statuses, as the categories of the Status column
+CONTEST_STATUSES = ['running', 'upcoming', 'past', 'unknown']
+
+# How far back the dashboard's "recently ended" list looks
+RECENTLY_ENDED_DAYS = 7
+
+# Function to determine contest status for every contest at once
+def compute_contest_status(contests, start_date_col, end_date_col, today):
+    """Classify contests as upcoming, running, past or unknown relative to today"""
+    if contests.empty or not start_date_col or not end_date_col:
+        status = np.full(len(contests), 'unknown', dtype=object)
+        return pd.Series(pd.Categorical(status, categories=CONTEST_STATUSES), index=contests.index)
+    
+    start = contests[start_date_col].values
+    end = contests[end_date_col].values
+    # Compare against day boundaries so times of day don't matter
+    day_start = np.datetime64(pd.Timestamp(today))
+    next_day = np.datetime64(pd.Timestamp(today) + pd.Timedelta(days=1))
+    
+    status = np.select(
+        [
+            pd.isna(start) | pd.isna(end),
+            start >= next_day,
+            end >= day_start,
+        ],
+        ['unknown', 'upcoming', 'running'],
+        default='past'
+    )
+    return pd.Series(pd.Categorical(status, categories=CONTEST_STATUSES), index=contests.index)
+
+# Function to fingerprint raw sheet data
+def data_fingerprint(df):
+    """Return a cheap content hash of a raw DataFrame, used as a cache key"""
+    if df.empty:
+        return f"empty:{'|'.join(map(str, df.columns))}"
+    # Hash the per-row hashes in order, so a re-sorted sheet gets a new fingerprint
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+    return f"{df.shape[0]}x{df.shape[1]}:{'|'.join(map(str, df.columns))}:{digest}"
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_SHARE = 0.5
+INTEGER_TEXT = r'^(0|[1-9][0-9]{0,17})$'
+
+# Function to measure a frame's memory, strings included
+def frame_memory(df):
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+# Function to shrink text columns to compact dtypes
+def compact_dtypes(df):
+    """Return df with whole-number text columns as integers and repetitive ones as categoricals
+
+    Each column is factorized once and only its distinct values are inspected,
+    so this costs about one pass per column. Blank cells in integer columns
+    become <NA> (nullable Int64); categorical values are kept exactly.
+    """
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if not (series.dtype == object or isinstance(series.dtype, pd.StringDtype)) or series.empty:
+            continue
+        codes, uniques = pd.factorize(series)
+        values = pd.Series(uniques, dtype=object)
+        text = values.astype(str).str.strip()
+        blank = (text == '').to_numpy()
+        whole = text.str.match(INTEGER_TEXT).to_numpy()
+
+        if whole.any() and (whole | blank).all():
+            numbers = pd.array([int(t) if w else None for t, w in zip(text, whole)], dtype='Int64')
+            numbers = numbers.take(codes, allow_fill=True)
+            converted[col] = pd.Series(numbers, index=df.index)
+            if not numbers.isna().any():
+                converted[col] = converted[col].astype('int64')
+        elif values.map(lambda v: isinstance(v, str)).all() and len(values) <= len(series) * CATEGORY_MAX_SHARE:
+            converted[col] = pd.Series(pd.Categorical.from_codes(codes, values.tolist()), index=df.index)
+    return df.assign(**converted) if converted else df
+
+# Function to detect columns and parse dates in contest data
+def prepare_contest_data(contests):
+    """Resolve contest columns and parse dates, returning (contests, column map)"""
+    contests = contests.copy()
+    columns = resolve_columns(contests.columns, CONTEST_COLUMNS)
+    
+    start_date_col = columns['start_date']
+    if start_date_col:
+        contests[start_date_col] = safe_to_datetime(contests[start_date_col])
+        contests['Start_Date'] = contests[start_date_col]
+        # Extract year and month with error handling
+        contests['Year'] = contests['Start_Date'].dt.year.where(contests['Start_Date'].notna(), pd.NA)
+        contests['Month'] = contests['Start_Date'].dt.month_name().where(contests['Start_Date'].notna(), pd.NA)
+        contests['Month_Num'] = contests['Start_Date'].dt.month.where(contests['Start_Date'].notna(), pd.NA)
+    
+    for key in ['end_date', 'winner_date']:
+        if columns[key]:
+            contests[columns[key]] = safe_to_datetime(contests[columns[key]])
+    
+    return compact_dtypes(contests), columns
+
+# Function to detect columns and parse dates in winner data
+def prepare_winner_data(winners):
+    """Rename winner headers to their canonical names and parse dates, returning (winners, column map)"""
+    resolved = resolve_columns(winners.columns, WINNER_COLUMNS)
+    renames = {header: name for name, header in resolved.items() if header and header != name}
+    winners = winners.rename(columns=renames) if renames else winners.copy()
+    date_cols = ['Start Date', 'End Date', 'Winner Announcement Date']
+    for col in date_cols:
+        if col in winners.columns:
+            winners[col] = safe_to_datetime(winners[col])
+    winners = compact_dtypes(winners)
+    
+    columns = {
+        'gift_status': 'Gift Status' if resolved['Gift Status'] else None,
+    }
+    return winners, columns
+
+# Function to count distinct non-blank values at some row positions
+def _nunique_at(series, positions):
+    return int(series.take(positions).nunique()) if len(positions) else 0
+
+# Function to work out everything the Contest Dashboard shows for a day
+def compute_dashboard_summary(contests, columns, positions, today):
+    """Dashboard counts, stats and row positions for contests that already have a Status
+
+    positions maps each status to its row positions. Everything comes back as
+    plain numbers, position arrays and small rollup frames, so the dashboard
+    only has to look things up.
+    """
+    start_col, end_col = columns.get('start_date'), columns.get('end_date')
+    camp_type_col, eligibility_col = columns.get('camp_type'), columns.get('eligibility')
+    day_start = pd.Timestamp(today)
+    running = positions['running']
+    upcoming = positions['upcoming']
+
+    summary = {
+        'total': len(contests),
+        'counts': {name: len(rows) for name, rows in positions.items()},
+        'current_month': 0,
+        'running': {'types': None, 'eligibilities': None, 'avg_days_left': None},
+        'upcoming_months': [],
+        'recently_ended': np.array([], dtype=np.int64),
+        'by_month': pd.DataFrame(),
+        'by_type': pd.DataFrame(),
+    }
+    if 'Year' in contests.columns and 'Month_Num' in contests.columns:
+        summary['current_month'] = int(((contests['Year'] == today.year) & (contests['Month_Num'] == today.month)).sum())
+
+    if camp_type_col:
+        summary['running']['types'] = _nunique_at(contests[camp_type_col], running)
+    if eligibility_col:
+        summary['running']['eligibilities'] = _nunique_at(contests[eligibility_col], running)
+    if end_col and len(running):
+        days_left = (contests[end_col].take(running).dt.normalize() - day_start).dt.days.dropna()
+        days_left = days_left[days_left >= 0]
+        if len(days_left):
+            summary['running']['avg_days_left'] = int(days_left.sum()) // len(days_left)
+
+    if start_col and len(upcoming):
+        # Upcoming contests grouped by the month they start in, earliest month first
+        starts = contests[start_col].take(upcoming)
+        months = starts.dt.to_period('M')
+        for month in sorted(months.dropna().unique()):
+            in_month = (months == month).to_numpy()
+            first_start = starts[in_month].min()
+            summary['upcoming_months'].append({
+                'label': month.strftime('%B %Y'),
+                'positions': upcoming[in_month],
+                'days_to_first': max((first_start.normalize() - day_start).days, 0),
+                'eligibilities': _nunique_at(contests[eligibility_col], upcoming[in_month]) if eligibility_col else None,
+            })
+
+    if end_col:
+        past = positions['past']
+        ended = contests[end_col].take(past) >= day_start - pd.Timedelta(days=RECENTLY_ENDED_DAYS)
+        summary['recently_ended'] = past[ended.to_numpy()]
+
+    # Contest counts per start month and per campaign type, split by status
+    if start_col:
+        start_month = contests[start_col].dt.to_period('M').rename('Start Month')
+        summary['by_month'] = (
+            contests.groupby([start_month, 'Status'], observed=True).size()
+            .unstack(fill_value=0).astype(int)
+        )
+    if camp_type_col:
+        summary['by_type'] = (
+            contests.groupby([camp_type_col, 'Status'], observed=True).size()
+            .unstack(fill_value=0).astype(int)
+        )
+    return summary
+
+# Winner columns searchable from the Check Winners section, and how
+WINNER_SEARCH_MODES = {
+    'businessid': 'id',
+    'customer_phonenumber': 'phone',
+    'customer_firstname': 'text',
+}
+
+# Days of contest status kept per dataset
+STATUS_DAYS_KEPT = 3
+
+
+class ContestDataset:
+    """Prepared contests and winners plus the indexes and statuses built on them
+
+    Frames are prepared once; indexes are built on first use and statuses are
+    memoized per day, so one instance can serve every rerun and session.
+    """
+
+    def __init__(self, contests, winners, columns, contest_fingerprint=None,
+                 winner_fingerprint=None, winner_sheet_name=None):
+        self.contests = contests
+        self.winners = winners
+        self.columns = columns
+        self.contest_fingerprint = contest_fingerprint or data_fingerprint(contests)
+        self.winner_fingerprint = winner_fingerprint or data_fingerprint(winners)
+        self.winner_sheet_name = winner_sheet_name
+        self.memory_report = {}
+        # True when restored from a snapshot instead of prepared from raw sheet data
+        self.restored = False
+        self._status = {}
+        self._indexes = {}
+        # Sessions asking for the same index share one build; different indexes build side by side
+        self._builds = SingleFlight()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_frames(cls, contests, winners, winner_sheet_name=None):
+        """Prepare raw get_all_records() frames"""
+        contest_fingerprint = data_fingerprint(contests)
+        winner_fingerprint = data_fingerprint(winners)
+        memory_before = {'contests': frame_memory(contests), 'winners': frame_memory(winners)}
+        columns = {}
+        contests, contest_columns = prepare_contest_data(contests)
+        columns.update(contest_columns)
+        winners, winner_columns = prepare_winner_data(winners)
+        columns.update(winner_columns)
+        dataset = cls(contests, winners, columns, contest_fingerprint, winner_fingerprint, winner_sheet_name)
+        dataset.memory_report = {
+            name: {'before': before, 'after': frame_memory(getattr(dataset, name))}
+            for name, before in memory_before.items()
+        }
+        return dataset
+
+    @classmethod
+    def from_records(cls, contest_records, winner_records, winner_sheet_name=None):
+        """Prepare raw worksheet records (lists of dicts)"""
+        return cls.from_frames(pd.DataFrame(contest_records), pd.DataFrame(winner_records), winner_sheet_name)
+
+    @classmethod
+    def from_snapshot(cls, contests, winners, meta):
+        """Wrap frames and meta() saved by a snapshot; they are already prepared"""
+        dataset = cls(
+            contests, winners, meta['columns'], meta.get('contest_fingerprint'),
+            meta.get('winner_fingerprint'), meta.get('winner_sheet_name')
+        )
+        dataset.restored = True
+        return dataset
+
+    def meta(self):
+        """JSON-serializable description, as stored alongside snapshots"""
+        return {
+            'columns': self.columns,
+            'winner_sheet_name': self.winner_sheet_name,
+            'contest_fingerprint': self.contest_fingerprint,
+            'winner_fingerprint': self.winner_fingerprint,
+        }
+
+    def missing_columns(self):
+        """Required contest column keys no sheet header could be matched to"""
+        return [key for key in REQUIRED_CONTEST_COLUMNS if not self.columns.get(key)]
+
+    def _index(self, key, build):
+        if key in self._indexes:
+            return self._indexes[key]
+
+        def build_once():
+            # A build that finished just before this call started is reused
+            if key not in self._indexes:
+                self._indexes[key] = build()
+            return self._indexes[key]
+        return self._builds.do(key, build_once)
+
+    def build_counters(self):
+        """Index requests that missed the cache: {'requests', 'executed', 'coalesced', 'errors'}
+
+        coalesced counts callers that waited for a build already in flight
+        instead of starting their own.
+        """
+        return self._builds.counters()
+
+    def _day(self, today):
+        # Status frame and per-status row positions for a day, built once and shared
+        with self._lock:
+            if today not in self._status:
+                if len(self._status) >= STATUS_DAYS_KEPT:
+                    self._status.pop(next(iter(self._status)))
+                status = compute_contest_status(
+                    self.contests, self.columns.get('start_date'), self.columns.get('end_date'), today
+                )
+                codes = status.cat.codes.to_numpy()
+                self._status[today] = {
+                    'frame': self.contests.assign(Status=status),
+                    'positions': {name: np.flatnonzero(codes == i) for i, name in enumerate(CONTEST_STATUSES)},
+                }
+            return self._status[today]
+
+    def status(self, today):
+        """Contest status series for the given day"""
+        return self._day(today)['frame']['Status']
+
+    def contests_with_status(self, today):
+        """Contests with a Status column for the given day
+
+        The frame is shared by every caller for that day - read it, never assign into it.
+        """
+        return self._day(today)['frame']
+
+    def dashboard_summary(self, today):
+        """compute_dashboard_summary() for the given day, built once per day and shared"""
+        with self._lock:
+            day = self._day(today)
+            if 'dashboard' not in day:
+                day['dashboard'] = compute_dashboard_summary(day['frame'], self.columns, day['positions'], today)
+            return day['dashboard']
+
+    def contests_by_status(self, today, status):
+        """Contests with the given status on the given day"""
+        day = self._day(today)
+        return day['frame'].iloc[day['positions'][status]]
+
+    def filter_contests(self, today, from_date=None, to_date=None, year=None, month_num=None, camp_type=None):
+        """Contests overlapping [from_date, to_date] that match the optional year/month/type"""
+        contests = self.contests_with_status(today)
+        start_col, end_col = self.columns.get('start_date'), self.columns.get('end_date')
+        camp_type_col = self.columns.get('camp_type')
+        # Filters on columns this data doesn't have are skipped
+        if not (start_col and end_col):
+            from_date = to_date = None
+        if 'Year' not in contests.columns:
+            year = None
+        if 'Month_Num' not in contests.columns:
+            month_num = None
+        if not camp_type_col:
+            camp_type = None
+
+        # Narrow down row positions first and take the matching rows once at the end
+        if from_date is not None and to_date is not None:
+            index = self._index('contest_range', lambda: DateRangeIndex(self.contests[start_col], self.contests[end_col]))
+            positions = index.overlapping(from_date, to_date)
+        else:
+            positions = np.arange(len(contests))
+        checks = []
+        if year is not None:
+            checks.append(('Year', int(year)))
+        if month_num is not None:
+            checks.append(('Month_Num', month_num))
+        if camp_type is not None:
+            checks.append((camp_type_col, camp_type))
+        for col, value in checks:
+            positions = positions[(contests[col].take(positions) == value).to_numpy(dtype=bool, na_value=False)]
+        return contests.iloc[positions]
+
+    def winners_in_range(self, from_date, to_date):
+        """Winners whose contest overlaps [from_date, to_date]"""
+        if 'Start Date' not in self.winners.columns or 'End Date' not in self.winners.columns:
+            return self.winners
+        index = self._index('winner_range', lambda: DateRangeIndex(self.winners['Start Date'], self.winners['End Date']))
+        return self.winners.iloc[index.overlapping(from_date, to_date)]
+
+    def campaign_winners(self):
+        """CampaignWinnerIndex linking contest rows to their winners, built once"""
+        def build():
+            camp_name_col = self.columns.get('camp_name')
+            gift_status_col = self.columns.get('gift_status')
+            return CampaignWinnerIndex(
+                self.contests[camp_name_col] if camp_name_col else pd.Series('', index=self.contests.index),
+                self.winners['Camp Description'] if 'Camp Description' in self.winners.columns else pd.Series(dtype=object),
+                self.winners[gift_status_col] if gift_status_col else None,
+                self.winners['Gift'] if 'Gift' in self.winners.columns else None,
+            )
+        return self._index('campaign_winners', build)
+
+    def card_winner_lines(self):
+        """Winner summary HTML for each contest card, by contest row label"""
+        return self._index('card_winner_lines', lambda: format_winner_lines(
+            self.campaign_winners().by_contest, show_delivery=bool(self.columns.get('gift_status'))
+        ))
+
+    def gift_analytics(self):
+        """GiftAnalytics over every winner, built once"""
+        return self._index('gift_analytics', lambda: GiftAnalytics(self.winners, self.columns.get('gift_status')))
+
+    def _search_modes(self):
+        modes = dict(WINNER_SEARCH_MODES)
+        if self.columns.get('gift_status'):
+            modes[self.columns['gift_status']] = 'category'
+        return modes
+
+    def search_winners(self, col, query, within=None):
+        """Winners whose col matches query, optionally limited to the rows of within"""
+        index = self._index('winner_search', lambda: WinnerSearchIndex(self.winners, self._search_modes()))
+        matches = self.winners.iloc[index.search(col, query)]
+        if within is not None:
+            matches = matches[matches.index.isin(within.index)]
+        return matches
+
+# Card look per status: (gradient, badge)
+CARD_STYLES = {
+    'running': ("linear-gradient(135deg, #4CAF50 0%, #2E7D32 100%)", "🏃 RUNNING NOW"),  # Green for running
+    'upcoming': ("linear-gradient(135deg, #667eea 0%, #764ba2 100%)", "📅 UPCOMING"),  # Purple for upcoming
+    'past': ("linear-gradient(135deg, #9e9e9e 0%, #616161 100%)", "✅ COMPLETED"),  # Grey for past or unknown
+}
+
+# Function to format a column of dates for display
+def format_date_column(series, fmt, missing='N/A'):
+    """Format a column of dates, keeping unparseable values as text and blanks as missing"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        dates = series
+    else:
+        dates = safe_to_datetime(series)
+        if not isinstance(dates, pd.Series):
+            dates = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    # Dates repeat a lot, so only format each distinct one
+    codes, uniques = pd.factorize(dates)
+    formatted = np.asarray(uniques.strftime(fmt), dtype=object)
+    result = pd.Series(formatted[codes] if len(formatted) else '', index=series.index, dtype=object)
+    blank = codes < 0
+    if blank.any():
+        raw = series[blank]
+        result[blank] = raw.where(raw.notna(), missing).astype(str)
+    return result
+
+# Card HTML, filled in per contest
+CARD_TEMPLATE = (
+    '<div class="contest-card" style="background: {gradient}; border-radius: 10px; padding: 20px; '
+    'margin: 10px 0; color: white; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1); position: relative;">'
+    '<div style="position: absolute; top: 10px; right: 10px; background: rgba(255,255,255,0.2); '
+    'padding: 2px 8px; border-radius: 12px; font-size: 12px;">{badge}</div>'
+    '<h3 style="margin: 0 0 10px 0; color: white; padding-right: 80px;">{camp_name}</h3>'
+    '<div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px;"><div>'
+    '<strong>🎯 Type:</strong> {camp_type}<br>'
+    '<strong>📋 Eligibility:</strong> {eligibility}<br>'
+    '<strong>👤 KAM:</strong> {kam}<br>'
+    '<strong>👥 Team:</strong> {to_whom}'
+    '</div><div>'
+    '<strong>📅 Starts:</strong> {start_date}<br>'
+    '<strong>🏁 Ends:</strong> {end_date}<br>'
+    '<strong>🏆 Winner Date:</strong> {winner_date}{days_left}'
+    '</div></div>{winners}</div>'
+)
+WINNER_LINE_TEMPLATE = (
+    '<div style="margin-top: 10px; padding-top: 8px; border-top: 1px solid rgba(255,255,255,0.3);">'
+    '<strong>🏆 Winners:</strong> {winners}{delivery}{gifts}</div>'
+)
+WINNER_DELIVERY_TEMPLATE = ' &nbsp;✅ {delivered} delivered &nbsp;⏳ {pending} pending'
+CARD_TEXT_FIELDS = ['camp_name', 'camp_type', 'eligibility', 'kam', 'to_whom']
+CARD_DATE_FIELDS = ['start_date', 'end_date', 'winner_date']
+CARD_DATE_FORMAT = '%d %b %Y'
+
+# Function to format the winners line of each contest card
+def format_winner_lines(by_contest, show_delivery=True):
+    """Series of winner-line HTML per contest row label, '' where a contest has no winners
+
+    show_delivery=False leaves out the delivered/pending split, for winners
+    sheets without a gift status column.
+    """
+    lines = pd.Series('', index=by_contest.index, dtype=object)
+    has_winners = by_contest[by_contest['winners'] > 0]
+    lines[has_winners.index] = [
+        WINNER_LINE_TEMPLATE.format(
+            winners=winners,
+            delivery=WINNER_DELIVERY_TEMPLATE.format(delivered=delivered, pending=pending) if show_delivery else '',
+            gifts=f'<br><strong>🎁 Top gifts:</strong> {gifts}' if gifts else '',
+        )
+        for winners, delivered, pending, gifts in zip(
+            has_winners['winners'], has_winners['delivered'], has_winners['pending'], has_winners['top_gifts']
+        )
+    ]
+    return lines
+
+# Function to turn a column into display text
+def text_column(series, missing='N/A'):
+    """Return the column as strings, with missing values shown as missing"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Format each category once; code -1 (missing) picks the last label
+        labels = np.append(series.cat.categories.astype(str).to_numpy(dtype=object), missing)
+        return pd.Series(labels[series.cat.codes.to_numpy()], index=series.index, dtype=object)
+    series = series.astype(object)
+    return series.where(series.notna(), missing).astype(str)
+
+# Function to format the days-left line of a running contest
+def _days_left_text(days):
+    return f"<br><strong>⏳ Days Left:</strong> {days} days"
+
+# Rendered cards kept by a CardCache
+CARD_CACHE_SIZE = 5000
+
+class CardCache:
+    """Rendered card HTML by (row content hash, day), least recently used dropped first
+
+    The hash covers every value a card shows - its fields, status and winner
+    line - so a changed row or a new day misses and is rebuilt, while an
+    unchanged contest is a lookup in every rerun and session.
+    """
+
+    def __init__(self, maxsize=CARD_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cards = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cards)
+
+    def get_many(self, keys):
+        """Cached card per key, None where there is none"""
+        with self._lock:
+            cards = []
+            for key in keys:
+                card = self._cards.get(key)
+                if card is not None:
+                    self._cards.move_to_end(key)
+                cards.append(card)
+            found = sum(card is not None for card in cards)
+            self.hits += found
+            self.misses += len(keys) - found
+            return cards
+
+    def put_many(self, keys, cards):
+        with self._lock:
+            for key, card in zip(keys, cards):
+                self._cards[key] = card
+                self._cards.move_to_end(key)
+            while len(self._cards) > self.maxsize:
+                self._cards.popitem(last=False)
+
+# Function to work out the cache key of each row's card
+def card_keys(df, columns, status, today, winner_lines=None):
+    """Return one (content hash, today, column layout) key per row"""
+    layout = tuple(
+        columns.get(key) if columns.get(key) in df.columns else None
+        for key in CARD_TEXT_FIELDS + CARD_DATE_FIELDS
+    )
+    content = {f'c{i}': df[col] for i, col in enumerate(dict.fromkeys(col for col in layout if col))}
+    content['status'] = status.astype(str)
+    if winner_lines is not None:
+        content['winners'] = winner_lines.reindex(df.index, fill_value='')
+    hashes = pd.util.hash_pandas_object(pd.DataFrame(content, index=df.index), index=False).tolist()
+    return [(h, today, layout) for h in hashes]
+
+# Function to create nice contest cards for a whole frame at once
+def build_contest_cards(df, columns, status, today, winner_lines=None, cache=None):
+    """Return a list with one card HTML string per contest row
+
+    winner_lines (from ContestDataset.card_winner_lines) adds each contest's
+    winner count, delivery split and top gifts. With a CardCache only rows
+    whose content changed since the cards were last built that day are formatted.
+    """
+    if df.empty:
+        return []
+    status = pd.Series(status, index=df.index) if not isinstance(status, pd.Series) else status
+    if cache is not None:
+        keys = card_keys(df, columns, status, today, winner_lines)
+        cards = cache.get_many(keys)
+        missing = [i for i, card in enumerate(cards) if card is None]
+        if missing:
+            built = build_contest_cards(df.iloc[missing], columns, status.iloc[missing], today, winner_lines)
+            cache.put_many([keys[i] for i in missing], built)
+            for i, card in zip(missing, built):
+                cards[i] = card
+        return cards
+    
+    # Every field is formatted column-wise, only the final fill-in is per row
+    fields = {}
+    for key in CARD_TEXT_FIELDS:
+        col = columns.get(key)
+        if col and col in df.columns:
+            fields[key] = text_column(df[col]).tolist()
+        else:
+            fields[key] = ['N/A'] * len(df)
+    for key in CARD_DATE_FIELDS:
+        col = columns.get(key)
+        if col and col in df.columns:
+            fields[key] = format_date_column(df[col], CARD_DATE_FORMAT).tolist()
+        else:
+            fields[key] = ['N/A'] * len(df)
+    
+    # Days left only for running contests
+    days_left = pd.Series('', index=df.index, dtype=object)
+    end_col = columns.get('end_date')
+    if end_col and end_col in df.columns and pd.api.types.is_datetime64_any_dtype(df[end_col]):
+        days = (df[end_col].dt.normalize() - pd.Timestamp(today)).dt.days
+        show = (status == 'running') & days.notna() & (days >= 0)
+        days_left[show] = days[show].astype(int).map(_days_left_text)
+    fields['days_left'] = days_left.tolist()
+    fields['winners'] = winner_lines.reindex(df.index, fill_value='').tolist() if winner_lines is not None else [''] * len(df)
+    
+    styles = [CARD_STYLES.get(s, CARD_STYLES['past']) for s in status.tolist()]
+    fields['gradient'] = [style[0] for style in styles]
+    fields['badge'] = [style[1] for style in styles]
+    
+    keys = list(fields)
+    return [CARD_TEMPLATE.format_map(dict(zip(keys, values))) for values in zip(*fields.values())]
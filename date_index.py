@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+
+# Function to turn a datetime column into whole days
+def _day_numbers(series):
+    """Return days since epoch as float, NaN for missing dates"""
+    dates = pd.to_datetime(series, errors='coerce').dt.normalize()
+    days = (dates - pd.Timestamp(0)).dt.days
+    return days.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _day_number(value):
+    return (pd.Timestamp(value).normalize() - pd.Timestamp(0)).days
+
+
+class DateRangeIndex:
+    """Answer "which rows overlap [from, to]" without scanning every row
+
+    Rows with a valid start <= end are kept sorted by start day. A row
+    overlaps the range when start <= to and end >= from, and since no row
+    lasts longer than the longest span, only starts in
+    [from - longest span, to] need checking - two binary searches and a
+    short slice. Rows with a missing date or end before start are few and
+    are checked directly with the original three-part rule (starts in range,
+    ends in range, or spans the range). Comparisons are by calendar day.
+    """
+
+    def __init__(self, start, end):
+        start_days = _day_numbers(start)
+        end_days = _day_numbers(end)
+        self.size = len(start_days)
+
+        regular = ~np.isnan(start_days) & ~np.isnan(end_days) & (start_days <= end_days)
+        positions = np.flatnonzero(regular)
+        order = np.argsort(start_days[regular], kind='stable')
+        self.positions = positions[order]
+        self.starts = start_days[regular][order]
+        self.ends = end_days[regular][order]
+        self.longest = float(np.max(self.ends - self.starts)) if len(self.starts) else 0.0
+
+        # Everything else is matched the slow way
+        self.irregular = np.flatnonzero(~regular)
+        self.irregular_starts = start_days[~regular]
+        self.irregular_ends = end_days[~regular]
+
+    def __len__(self):
+        return self.size
+
+    def overlapping(self, from_date, to_date):
+        """Sorted row positions of rows that overlap [from_date, to_date]"""
+        lo = _day_number(from_date)
+        hi = _day_number(to_date)
+
+        if lo <= hi:
+            first = np.searchsorted(self.starts, lo - self.longest, side='left')
+            last = np.searchsorted(self.starts, hi, side='right')
+            hit = self.ends[first:last] >= lo
+            found = self.positions[first:last][hit]
+        else:
+            # An inverted range only matches rows spanning it
+            hit = (self.starts <= lo) & (self.ends >= hi)
+            found = self.positions[hit]
+
+        starts, ends = self.irregular_starts, self.irregular_ends
+        with np.errstate(invalid='ignore'):
+            odd_hit = (
+                ((starts >= lo) & (starts <= hi)) |
+                ((ends >= lo) & (ends <= hi)) |
+                ((starts <= lo) & (ends >= hi))
+            )
+        return np.sort(np.concatenate([found, self.irregular[odd_hit]]))
@@ -0,0 +1,100 @@
+import gzip
+import io
+from importlib.util import find_spec
+
+import pandas as pd
+
+from contest_core import format_date_column
+from snapshot_store import parquet_ready
+
+# Rows formatted and written per step, so a big export never holds a full text copy
+EXPORT_CHUNK_ROWS = 50000
+EXPORT_DATE_FORMAT = '%d-%m-%Y'
+
+# Download formats: key -> (label, file extension, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('CSV', 'csv', 'text/csv'),
+    'csv.gz': ('CSV (gzip)', 'csv.gz', 'application/gzip'),
+    'parquet': ('Parquet', 'parquet', 'application/vnd.apache.parquet'),
+    'xlsx': ('Excel', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+# An Excel sheet holds 1,048,576 rows including the header
+EXCEL_MAX_ROWS = 1048575
+
+# Columns included in the winners download, in order
+WINNER_EXPORT_COLUMNS = [
+    'Camp Description', 'Contest', 'Gift', 'Start Date', 'End Date',
+    'businessid', 'customer_customerid', 'customer_phonenumber',
+    'customer_firstname', 'business_displayname', 'address_addresslocality',
+    'Winner Announcement Date'
+]
+WINNER_DATE_COLUMNS = ['Start Date', 'End Date', 'Winner Announcement Date']
+
+
+# Function to list the formats this install can write
+def available_export_formats():
+    """Export format keys whose libraries are installed"""
+    formats = ['csv', 'csv.gz']
+    if find_spec('pyarrow'):
+        formats.append('parquet')
+    if find_spec('openpyxl') or find_spec('xlsxwriter'):
+        formats.append('xlsx')
+    return formats
+
+
+# Function to stream a frame as CSV
+def iter_csv_chunks(df, date_columns=(), chunk_rows=EXPORT_CHUNK_ROWS, date_format=EXPORT_DATE_FORMAT):
+    """Yield df as UTF-8 CSV bytes, one chunk of rows at a time
+
+    Date columns are formatted per chunk (each distinct date once) and
+    missing dates are written as empty cells.
+    """
+    date_columns = [col for col in date_columns if col and col in df.columns]
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        if date_columns:
+            chunk = chunk.assign(**{
+                col: format_date_column(chunk[col], date_format, missing='') for col in date_columns
+            })
+        yield chunk.to_csv(index=False, header=start == 0).encode('utf-8')
+
+
+# Function to serialize a frame for download
+def export_bytes(df, fmt, date_columns=()):
+    """Return df as bytes in one of EXPORT_FORMATS
+
+    CSV dates use EXPORT_DATE_FORMAT; Parquet and Excel keep real dates.
+    """
+    if fmt == 'csv':
+        return b''.join(iter_csv_chunks(df, date_columns))
+    buffer = io.BytesIO()
+    if fmt == 'csv.gz':
+        with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as gz:
+            for chunk in iter_csv_chunks(df, date_columns):
+                gz.write(chunk)
+    elif fmt == 'parquet':
+        parquet_ready(df).to_parquet(buffer, index=False)
+    elif fmt == 'xlsx':
+        if len(df) > EXCEL_MAX_ROWS:
+            raise ValueError(f"{len(df)} rows is more than an Excel sheet can hold, use CSV or Parquet")
+        with pd.ExcelWriter(buffer, datetime_format='dd-mm-yyyy', date_format='dd-mm-yyyy') as writer:
+            df.to_excel(writer, index=False)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return buffer.getvalue()
+
+
+# Function to pick the winners download columns
+def winner_export_frame(winners, gift_status_col=None):
+    """Winners restricted to the download columns that exist, in order"""
+    download_cols = list(WINNER_EXPORT_COLUMNS)
+    if gift_status_col and gift_status_col in winners.columns:
+        download_cols.append(gift_status_col)
+    return winners[[col for col in download_cols if col in winners.columns]]
+
+
+# Function to build the winners CSV download
+def export_winners_csv(winners, gift_status_col=None):
+    """Return the winners download as UTF-8 CSV bytes"""
+    return export_bytes(winner_export_frame(winners, gift_status_col), 'csv', WINNER_DATE_COLUMNS)
@@ -0,0 +1,125 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from campaign_index import is_delivered
+
+# Dimensions delivery figures can be grouped by: name -> winners column
+# (Week and Month come from the Winner Announcement Date)
+ANALYTICS_COLUMNS = {
+    'Gift': 'Gift',
+    'Locality': 'address_addresslocality',
+    'Camp Description': 'Camp Description',
+    'Camp Type': 'Camp Type',
+}
+ANALYTICS_DATE_COLUMN = 'Winner Announcement Date'
+TIME_DIMENSIONS = ['Week', 'Month']
+
+# Pending-age buckets in days since the winner announcement
+PENDING_AGE_BINS = [-np.inf, 7, 14, 30, 60, 90, np.inf]
+PENDING_AGE_LABELS = ['0-7 days', '8-14 days', '15-30 days', '31-60 days', '61-90 days', '90+ days']
+NO_DATE_LABEL = 'No date'
+
+# Rollups kept per analytics object
+ROLLUP_CACHE_SIZE = 64
+
+
+class GiftAnalytics:
+    """Gift delivery counts over the full winner history, grouped any way
+
+    Winners are counted once into a cube - one row per announcement day,
+    gift, locality, campaign and camp type with winner and delivered counts -
+    and every rollup, drill-down or pending-age breakdown is a small groupby
+    over that cube. Results are cached, so repeat queries are lookups.
+    """
+
+    def __init__(self, winners, gift_status_col=None):
+        dims = {}
+        if ANALYTICS_DATE_COLUMN in winners.columns:
+            dims['Day'] = pd.to_datetime(winners[ANALYTICS_DATE_COLUMN], errors='coerce').dt.normalize()
+        for name, col in ANALYTICS_COLUMNS.items():
+            if col in winners.columns:
+                dims[name] = winners[col]
+        self.dimensions = [name for name in dims if name != 'Day']
+        if 'Day' in dims:
+            self.dimensions = TIME_DIMENSIONS + self.dimensions
+
+        frame = pd.DataFrame(dims, index=winners.index)
+        if gift_status_col and gift_status_col in winners.columns:
+            frame['delivered'] = is_delivered(winners[gift_status_col])
+        else:
+            frame['delivered'] = False
+
+        keys = [name for name in dims]
+        if keys:
+            cube = frame.groupby(keys, observed=True, dropna=False, sort=False)['delivered'].agg(['size', 'sum'])
+            cube = cube.rename(columns={'size': 'winners', 'sum': 'delivered'}).reset_index()
+        else:
+            cube = pd.DataFrame({'winners': [len(frame)], 'delivered': [int(frame['delivered'].sum())]})
+        cube['delivered'] = cube['delivered'].astype(int)
+        if 'Day' in cube.columns:
+            cube['Week'] = cube['Day'].dt.to_period('W')
+            cube['Month'] = cube['Day'].dt.to_period('M')
+        self.cube = cube
+        self.total = len(winners)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, key, build):
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+        result = build()
+        with self._lock:
+            if len(self._cache) >= ROLLUP_CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = result
+        return result
+
+    def _filtered(self, filters):
+        cube = self.cube
+        for dim, value in (filters or {}).items():
+            cube = cube[cube[dim] == value]
+        return cube
+
+    def values(self, dim):
+        """Distinct values of a dimension, for drill-down pickers"""
+        return self._cached(('values', dim), lambda: sorted(self.cube[dim].dropna().unique().tolist()))
+
+    def rollup(self, by, filters=None):
+        """Winners, delivered, pending and delivery rate grouped by the given dimensions
+
+        filters ({dimension: value}) drills down first. Time dimensions come back
+        in date order, others with the most winners first.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        key = ('rollup', tuple(by), tuple(sorted((filters or {}).items(), key=str)))
+
+        def build():
+            cube = self._filtered(filters)
+            result = cube.groupby(by, observed=True, dropna=False, sort=False)[['winners', 'delivered']].sum()
+            result['pending'] = result['winners'] - result['delivered']
+            result['delivery_rate'] = (result['delivered'] / result['winners'] * 100).round(1)
+            if by[0] in TIME_DIMENSIONS:
+                return result.sort_index()
+            return result.sort_values('winners', ascending=False, kind='stable')
+
+        return self._cached(key, build)
+
+    def pending_ages(self, today, filters=None):
+        """Pending gifts per age bucket (days since the winner announcement) as of today"""
+        key = ('pending_ages', today, tuple(sorted((filters or {}).items(), key=str)))
+
+        def build():
+            cube = self._filtered(filters)
+            pending = cube['winners'] - cube['delivered']
+            labels = pd.Series(NO_DATE_LABEL, index=cube.index, dtype=object)
+            if 'Day' in cube.columns:
+                ages = (pd.Timestamp(today) - cube['Day']).dt.days
+                dated = ages.notna()
+                labels[dated] = pd.cut(ages[dated], PENDING_AGE_BINS, labels=PENDING_AGE_LABELS).astype(object)
+            counts = pending.groupby(labels).sum()
+            return counts.reindex(PENDING_AGE_LABELS + [NO_DATE_LABEL], fill_value=0).astype(int)
+
+        return self._cached(key, build)
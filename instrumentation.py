@@ -0,0 +1,122 @@
+"""Per-stage timings for the dashboard: wall time, rows and memory delta
+
+Each rerun (and each background refresh) records its stages with a
+StageRecorder and appends them to a JSON-lines log. Summarize a log with
+
+    python instrumentation.py .logs/stages.jsonl
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+# Pipeline stages in the order they usually run
+STAGES = ['connect', 'fetch', 'parse', 'classify', 'filter', 'search', 'render', 'export']
+
+STAGE_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.logs', 'stages.jsonl')
+# The log is rotated to <path>.1 once it grows past this
+STAGE_LOG_MAX_BYTES = 5 * 2 ** 20
+
+
+# Function to read this process's resident memory
+def current_rss():
+    """Resident set size in bytes, or None where /proc isn't available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+class StageRecorder:
+    """Timings for the stages of one run - a rerun or a background refresh"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Time the block; set record['rows'] inside it if the count is only known then"""
+        record = {'stage': name, 'rows': rows}
+        rss_before = current_rss()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - started, 6)
+            rss_after = current_rss()
+            record['mem_delta_mb'] = (
+                round((rss_after - rss_before) / 2 ** 20, 3) if rss_before is not None and rss_after is not None else None
+            )
+            self.records.append(record)
+
+    def rows(self):
+        """Records tagged with the run, ready to log"""
+        return [dict(record, kind=self.kind, run_id=self.run_id, run_at=self.started_at) for record in self.records]
+
+
+class StageLog:
+    """Appends stage records to a JSON-lines file and keeps the latest run of each kind"""
+
+    def __init__(self, path=STAGE_LOG_PATH, max_bytes=STAGE_LOG_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.latest = {}
+        self._lock = threading.Lock()
+
+    def write(self, recorder):
+        """Log a finished run; the log is best-effort and never raises"""
+        rows = recorder.rows()
+        if not rows:
+            return
+        with self._lock:
+            self.latest[recorder.kind] = rows
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, self.path + '.1')
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(row) + '\n' for row in rows)
+            except OSError:
+                pass
+
+
+# Function to work out p50/p95 per stage from logged records
+def stage_percentiles(records):
+    """Return {stage: {'runs', 'p50', 'p95', 'max'}} in seconds"""
+    by_stage = {}
+    for record in records:
+        by_stage.setdefault(record['stage'], []).append(record['seconds'])
+    order = {name: i for i, name in enumerate(STAGES)}
+    return {
+        stage: {
+            'runs': len(seconds),
+            'p50': float(np.percentile(seconds, 50)),
+            'p95': float(np.percentile(seconds, 95)),
+            'max': max(seconds),
+        }
+        for stage, seconds in sorted(by_stage.items(), key=lambda item: order.get(item[0], len(order)))
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else STAGE_LOG_PATH
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    print(f"{'stage':<12}{'runs':>8}{'p50 s':>12}{'p95 s':>12}{'max s':>12}")
+    for stage, stats in stage_percentiles(records).items():
+        print(f"{stage:<12}{stats['runs']:>8}{stats['p50']:>12.4f}{stats['p95']:>12.4f}{stats['max']:>12.4f}")
+
+
+if __name__ == '__main__':
+    main()
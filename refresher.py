@@ -0,0 +1,79 @@
+import threading
+from datetime import datetime
+
+# Seconds between background reloads
+REFRESH_INTERVAL = 300
+
+
+class DataRefresher:
+    """Reload data on a background thread and always serve the last good copy
+
+    load(current, full) runs on the worker thread with the value being served
+    (or None) and returns the new value - returning current unchanged is
+    fine. full is True for a reload asked for with refresh(full=True).
+    Readers never wait on a reload once a value exists: they keep getting
+    the previous value until the new one is swapped in with a single
+    assignment. A failed reload keeps the old value and records the error.
+    """
+
+    def __init__(self, load, interval=REFRESH_INTERVAL, initial=None, initial_source='snapshot', initial_time=None):
+        self._load = load
+        self.interval = interval
+        self._state = None
+        if initial is not None:
+            self._state = {'value': initial, 'source': initial_source, 'loaded_at': initial_time}
+        self.last_error = None
+        self.refreshing = False
+        self._wake = threading.Event()
+        self._full_requested = False
+        self._attempted = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread (once); it loads immediately, then every interval"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='data-refresher', daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            # Cleared before loading, so a refresh() asked for mid-load runs right after
+            self._wake.clear()
+            full, self._full_requested = self._full_requested, False
+            self.refresh_now(full)
+            self._wake.wait(self.interval)
+
+    def refresh_now(self, full=False):
+        """Reload on the calling thread and swap the result in, returns True on success"""
+        self.refreshing = True
+        try:
+            current = self._state['value'] if self._state else None
+            value = self._load(current, full)
+            if value is not None:
+                self._state = {'value': value, 'source': 'live', 'loaded_at': datetime.now()}
+            self.last_error = None
+            return value is not None
+        except Exception as e:
+            self.last_error = e
+            return False
+        finally:
+            self.refreshing = False
+            self._attempted.set()
+
+    def refresh(self, full=False):
+        """Ask the worker to reload now without waiting for it, re-reading everything when full"""
+        if full:
+            self._full_requested = True
+        self._wake.set()
+
+    def current(self):
+        """Return {'value', 'source', 'loaded_at'} for the data being served, or None before the first load"""
+        return self._state
+
+    def wait(self, timeout=None):
+        """Block until the first load attempt finishes, then return current()"""
+        self._attempted.wait(timeout)
+        return self._state
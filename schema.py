@@ -0,0 +1,92 @@
+import difflib
+import re
+from functools import lru_cache
+
+# Contest Details columns: key -> header names to look for, best first
+CONTEST_COLUMNS = {
+    'camp_name': ['Camp Name', 'Campaign Name', 'Camp Description', 'Camp'],
+    'camp_type': ['Camp Type', 'Type', 'Category'],
+    'start_date': ['Start Date', 'StartDate', 'Start'],
+    'end_date': ['End Date', 'EndDate', 'End'],
+    'winner_date': ['Winner Announcement Date', 'Winner Date', 'Announcement Date', 'Winner Announcement', 'Winner Ann Date'],
+    'kam': ['KAM', 'Owner', 'Manager', 'Responsible'],
+    'to_whom': ['To Whom?', 'To Whom', 'Assigned To', 'Team'],
+    'eligibility': ['Contest Eligiblity', 'Contest Eligibility', 'Eligibility'],
+}
+
+# Contest columns the dashboard can't work without
+REQUIRED_CONTEST_COLUMNS = ['camp_name', 'start_date', 'end_date']
+
+# Winners Details columns: canonical header -> header names to look for.
+# Matched headers are renamed to the canonical one when winners are prepared.
+WINNER_COLUMNS = {
+    'Camp Description': ['Camp Description'],
+    'Camp Type': ['Camp Type'],
+    'Contest': ['Contest'],
+    'Gift': ['Gift'],
+    'Start Date': ['Start Date', 'StartDate'],
+    'End Date': ['End Date', 'EndDate'],
+    'Winner Announcement Date': ['Winner Announcement Date', 'Winner Date'],
+    'businessid': ['businessid', 'Business ID', 'BZID'],
+    'customer_customerid': ['customer_customerid', 'Customer ID'],
+    'customer_phonenumber': ['customer_phonenumber', 'Phone Number', 'Phone'],
+    'customer_firstname': ['customer_firstname', 'Customer Name', 'First Name'],
+    'business_displayname': ['business_displayname', 'Store Name'],
+    'address_addresslocality': ['address_addresslocality', 'Locality'],
+    'Gift Status': ['Gift Status', 'GiftStatus', 'Status', 'Delivery Status'],
+}
+
+# How close a header must be to a candidate name to count as a fuzzy match
+FUZZY_CUTOFF = 0.85
+
+
+# Function to normalize a header for matching
+def normalize_header(name):
+    """Lowercase, treat _ - . ? as spaces and collapse whitespace"""
+    name = re.sub(r'[_\-.?:/]+', ' ', str(name).casefold())
+    return ' '.join(name.split())
+
+
+@lru_cache(maxsize=64)
+def _resolve(headers, schema_items, cutoff):
+    normalized = {}
+    for header in headers:
+        normalized.setdefault(normalize_header(header), header)
+
+    resolved = {}
+    used = set()
+    # Exact names win, then normalized names, then fuzzy - each pass in candidate order
+    for key, candidates in schema_items:
+        resolved[key] = next((c for c in candidates if c in headers), None)
+        if resolved[key] is not None:
+            used.add(resolved[key])
+    for key, candidates in schema_items:
+        if resolved[key] is None:
+            for candidate in candidates:
+                header = normalized.get(normalize_header(candidate))
+                if header is not None and header not in used:
+                    resolved[key] = header
+                    used.add(header)
+                    break
+    for key, candidates in schema_items:
+        if resolved[key] is None:
+            choices = [n for n, h in normalized.items() if h not in used]
+            for candidate in candidates:
+                close = difflib.get_close_matches(normalize_header(candidate), choices, n=1, cutoff=cutoff)
+                if close:
+                    resolved[key] = normalized[close[0]]
+                    used.add(resolved[key])
+                    break
+    return tuple(resolved.items())
+
+
+# Function to map schema keys to the actual headers of a sheet
+def resolve_columns(headers, schema, cutoff=FUZZY_CUTOFF):
+    """Return {key: header or None} for a schema, cached per header list
+
+    Matching ignores case, surrounding/repeated spaces and _ - . ? characters,
+    and falls back to a fuzzy match so a slightly renamed header still
+    resolves. A header is never assigned to two keys.
+    """
+    schema_items = tuple((key, tuple(candidates)) for key, candidates in schema.items())
+    return dict(_resolve(tuple(str(h) for h in headers), schema_items, cutoff))
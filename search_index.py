@@ -0,0 +1,137 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Below this many distinct values a plain scan beats the trigram index
+TRIGRAM_MIN_UNIQUES = 2000
+
+
+# Function to normalize a cell value for searching
+def normalize_search_value(value):
+    """Return the lowercase, trimmed text form of a cell ('' for blanks)"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().casefold()
+
+
+# Function to normalize a whole column of values for searching
+def normalize_search_column(values):
+    """Vectorized normalize_search_value over a Series"""
+    values = values.map(lambda v: int(v) if isinstance(v, float) and v.is_integer() else v)
+    return values.astype(str).str.strip().str.casefold().where(values.notna(), '')
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _ColumnIndex:
+    """Row positions grouped by distinct value, plus exact and trigram lookups
+
+    Modes 'id' and 'phone' try an exact lookup (also by digits only) before
+    falling back to substring matching; 'text' and 'category' always match
+    substrings.
+    """
+
+    def __init__(self, series, mode):
+        self.mode = mode
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self.text = normalize_search_column(pd.Series(uniques, dtype=object))
+        self.values = self.text.tolist()
+
+        # Rows of each distinct value, as slices of one sorted position array
+        valid = codes >= 0
+        positions = np.flatnonzero(valid)
+        order = np.argsort(codes[valid], kind='stable')
+        self.positions = positions[order]
+        counts = np.bincount(codes[valid], minlength=len(self.values))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        # Exact lookup: normalized text (and digits-only aliases) -> distinct value codes
+        self.exact = {}
+        aliases = [self.text]
+        if mode in ('id', 'phone'):
+            digits = self.text.str.replace(r'\D', '', regex=True)
+            aliases.append(digits)
+            if mode == 'phone':
+                aliases.append(digits.where(digits.str.len() > 10, '').str[-10:])
+        for keys in aliases:
+            for code, key in enumerate(keys.tolist()):
+                if key:
+                    self.exact.setdefault(key, []).append(code)
+
+        # Trigrams only pay off for name-like text; ids and phones are all distinct
+        self.trigrams = None
+        if mode == 'text' and len(self.values) >= TRIGRAM_MIN_UNIQUES:
+            self.trigrams = {}
+            for code, text in enumerate(self.values):
+                for gram in _trigrams(text):
+                    self.trigrams.setdefault(gram, []).append(code)
+            self.trigrams = {gram: np.array(codes_, dtype=np.int64) for gram, codes_ in self.trigrams.items()}
+
+    def _keys(self, text):
+        keys = {text}
+        if self.mode in ('id', 'phone'):
+            digits = re.sub(r'\D', '', text)
+            if digits:
+                keys.add(digits)
+                if self.mode == 'phone' and len(digits) > 10:
+                    keys.add(digits[-10:])
+        return keys
+
+    def rows(self, codes):
+        """Sorted row positions for the given distinct value codes"""
+        if not len(codes):
+            return np.array([], dtype=np.int64)
+        parts = [self.positions[self.offsets[c]:self.offsets[c + 1]] for c in codes]
+        return np.sort(np.concatenate(parts))
+
+    def search(self, query):
+        query = normalize_search_value(query)
+        if not query:
+            return np.array([], dtype=np.int64)
+
+        if self.mode in ('id', 'phone'):
+            codes = set()
+            for key in self._keys(query):
+                codes.update(self.exact.get(key, []))
+            if codes:
+                return self.rows(sorted(codes))
+
+        # Substring match over distinct values, narrowed by trigrams when indexed
+        if self.trigrams is not None and len(query) >= 3:
+            candidates = None
+            for gram in _trigrams(query):
+                posting = self.trigrams.get(gram)
+                if posting is None:
+                    return np.array([], dtype=np.int64)
+                candidates = posting if candidates is None else np.intersect1d(candidates, posting, assume_unique=True)
+            return self.rows([c for c in candidates if query in self.values[c]])
+        return self.rows(np.flatnonzero(self.text.str.contains(query, regex=False).values))
+
+
+class WinnerSearchIndex:
+    """Search index over the winners frame, built once per dataset load
+
+    search() returns row positions (for .iloc) in original row order, matching
+    the case-insensitive substring search it replaces. Exact values of id and
+    phone columns are answered from a hash lookup.
+    """
+
+    def __init__(self, winners, modes):
+        self.columns = {}
+        for col, mode in modes.items():
+            if col and col in winners.columns:
+                self.columns[col] = _ColumnIndex(winners[col], mode)
+
+    def __contains__(self, col):
+        return col in self.columns
+
+    def search(self, col, query):
+        """Row positions of winners whose col matches query"""
+        if col not in self.columns:
+            return np.array([], dtype=np.int64)
+        return self.columns[col].search(query)
@@ -0,0 +1,264 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime
+
+from schema import resolve_columns
+
+# Where synced worksheet copies are kept between runs
+SYNC_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sheet_cache')
+
+# Existing rows re-checked in full on every sync (recent rows get most edits)
+VERIFY_ROWS = 200
+
+# Older rows whose watched cells changed are re-read one by one up to this
+# many; beyond that a full read is cheaper
+MAX_STALE_ROWS = 500
+
+# Every Nth sync re-reads the whole sheet to catch edits to older rows
+FULL_SYNC_EVERY = 12
+
+
+# Function to turn a 1-based column number into a sheet column letter
+def column_letter(col):
+    """Return the A1 column letter for a 1-based column number"""
+    letters = ''
+    while col > 0:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+# Function to convert cell text the same way gspread's get_all_records does
+def numericise(value):
+    """Convert numeric-looking strings to int/float, leave everything else alone
+
+    Like gspread.utils.numericise: thousands separators are dropped ('1,234'
+    -> 1234) and anything with an underscore stays text.
+    """
+    if not isinstance(value, str) or '_' in value:
+        return value
+    cleaned = value.replace(',', '')
+    try:
+        return int(cleaned)
+    except ValueError:
+        try:
+            return float(cleaned)
+        except ValueError:
+            return value
+
+
+# Function to hash one row of cell values
+def row_hash(row):
+    """Return a short content hash for a row of cell values"""
+    return hashlib.blake2b('\x1f'.join(map(str, row)).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class IncrementalSheetSync:
+    """Keep a local copy of a worksheet and only fetch appended or changed rows
+
+    Every sync reads column A and the watched columns of the whole sheet,
+    plus the last verify_rows rows and anything appended, in one request.
+    watch is a schema dict ({key: header names}, as for resolve_columns) of
+    columns edited on old rows, such as Gift Status; rows whose watched
+    cells changed are re-read. Edits to other columns of older rows wait for
+    the periodic full read, or a sync(full=True).
+
+    The worksheet only needs ``row_values`` and ``batch_get`` (the gspread
+    Worksheet API), so a local fake client can stand in for it;
+    benchmarks/bench_sheet_sync.py checks it against one.
+    """
+
+    def __init__(self, name, cache_dir=SYNC_CACHE_DIR, verify_rows=VERIFY_ROWS,
+                 full_sync_every=FULL_SYNC_EVERY, watch=None):
+        self.name = name
+        self.cache_dir = cache_dir
+        self.verify_rows = verify_rows
+        self.full_sync_every = full_sync_every
+        self.watch = watch or {}
+        self.path = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_-]+', '_', name.strip()) + '.json')
+        self.state = None
+        self.last_stats = {}
+        self._lock = threading.Lock()
+
+    def sync(self, worksheet, full=False):
+        """Bring the local copy up to date and return it as a list of records
+
+        full=True re-reads the whole worksheet, as a manual refresh should.
+        """
+        with self._lock:
+            if self.state is None:
+                self.state = self._load_state()
+
+            header = worksheet.row_values(1)
+            state = self.state
+            needs_full = (
+                full or
+                state is None or
+                state['header'] != header or
+                (self.full_sync_every and state['syncs'] % self.full_sync_every == 0)
+            )
+
+            if needs_full:
+                stats = self._full_sync(worksheet, header)
+            else:
+                stats = self._incremental_sync(worksheet, header)
+
+            self.state['syncs'] += 1
+            self.state['synced_at'] = datetime.now().isoformat(timespec='seconds')
+            self._save_state()
+            self.last_stats = stats
+            return self.records()
+
+    def records(self):
+        """Return the local copy as get_all_records-style dicts"""
+        if not self.state:
+            return []
+        header = self.state['header']
+        return [dict(zip(header, map(numericise, row))) for row in self.state['rows']]
+
+    def _full_sync(self, worksheet, header):
+        """Read every data row of the worksheet"""
+        width = len(header)
+        rows = []
+        if width:
+            # Open-ended range: rows whose column A is blank still come back
+            rows = worksheet.batch_get([self._range(2, None, width)])[0]
+        rows = [self._pad(row, width) for row in rows]
+        self.state = {
+            'header': header,
+            'rows': rows,
+            'hashes': [row_hash(row) for row in rows],
+            'column_a': [row[0] if row else '' for row in rows],
+            'syncs': self.state['syncs'] if self.state else 0,
+            'synced_at': None,
+        }
+        return {'mode': 'full', 'rows': len(rows), 'appended': len(rows), 'changed': 0}
+
+    def _incremental_sync(self, worksheet, header):
+        """Fetch appended rows, a window of recent rows and older rows whose watched cells changed
+
+        Positions are only trusted while column A still lines up with the
+        local copy; an insert, delete or re-sort anywhere in the sheet moves
+        it and falls back to a full read.
+        """
+        width = len(header)
+        state = self.state
+        synced = len(state['rows'])
+        watched = self._watched(header)
+        verify_from = max(0, synced - self.verify_rows)
+
+        # Whole columns (A and the watched ones), the verify window and the
+        # open-ended appended range, so rows with a blank column A aren't missed
+        ranges = [self._column_range(col) for col in [0] + watched]
+        if synced > verify_from:
+            ranges.append(self._range(verify_from + 2, synced + 1, width))
+        ranges.append(self._range(synced + 2, None, width))
+
+        # One batched request for all of them
+        results = worksheet.batch_get(ranges)
+        columns = [self._cells(results.pop(0), synced) for _ in [0] + watched]
+        appended_rows = results.pop()
+
+        if state.get('column_a') != columns[0]:
+            return self._full_sync(worksheet, header)
+
+        updates = {}
+        if synced > verify_from:
+            window = results.pop(0)
+            # Trailing rows came back empty with nothing after them - rows were removed
+            if len(window) < synced - verify_from and not appended_rows:
+                return self._full_sync(worksheet, header)
+            for offset in range(synced - verify_from):
+                pos = verify_from + offset
+                row = self._pad(window[offset] if offset < len(window) else [], width)
+                digest = row_hash(row)
+                if digest != state['hashes'][pos]:
+                    updates[pos] = (row, digest)
+            # Every recent row differs - more likely shifted rows than edits
+            if len(updates) == synced - verify_from:
+                return self._full_sync(worksheet, header)
+
+        # Older rows whose watched cells no longer match the local copy
+        stale = sorted({
+            pos for col, values in zip(watched, columns[1:])
+            for pos in range(verify_from) if values[pos] != state['rows'][pos][col]
+        })
+        if len(stale) > MAX_STALE_ROWS:
+            return self._full_sync(worksheet, header)
+        if stale:
+            runs = self._runs(stale)
+            fetched = worksheet.batch_get([self._range(first + 2, last + 2, width) for first, last in runs])
+            for (first, last), rows in zip(runs, fetched):
+                for pos in range(first, last + 1):
+                    row = self._pad(rows[pos - first] if pos - first < len(rows) else [], width)
+                    updates[pos] = (row, row_hash(row))
+
+        for pos, (row, digest) in updates.items():
+            state['rows'][pos] = row
+            state['hashes'][pos] = digest
+            state['column_a'][pos] = row[0] if row else ''
+
+        for row in appended_rows:
+            row = self._pad(row, width)
+            state['rows'].append(row)
+            state['hashes'].append(row_hash(row))
+            state['column_a'].append(row[0] if row else '')
+
+        return {'mode': 'incremental', 'rows': len(state['rows']), 'appended': len(appended_rows), 'changed': len(updates)}
+
+    def _watched(self, header):
+        """0-based positions of the watched columns found in header, column A aside"""
+        if not self.watch:
+            return []
+        found = resolve_columns(header, self.watch).values()
+        return sorted({header.index(name) for name in found if name is not None} - {0})
+
+    def _runs(self, positions):
+        """Sorted positions grouped into (first, last) runs of consecutive rows"""
+        runs = []
+        for pos in positions:
+            if runs and runs[-1][1] == pos - 1:
+                runs[-1][1] = pos
+            else:
+                runs.append([pos, pos])
+        return [tuple(run) for run in runs]
+
+    def _cells(self, column_rows, length):
+        """Values of a one-column range, padded with '' to length rows"""
+        values = [row[0] if row else '' for row in column_rows[:length]]
+        return values + [''] * (length - len(values))
+
+    def _column_range(self, col):
+        letter = column_letter(col + 1)
+        return f"{letter}2:{letter}"
+
+    def _range(self, first_row, last_row, width):
+        # last_row=None leaves the range open to the end of the sheet
+        return f"A{first_row}:{column_letter(max(width, 1))}{last_row or ''}"
+
+    def _pad(self, row, width):
+        row = list(row)[:width]
+        return row + [''] * (width - len(row))
+
+    def _load_state(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Unique temp name so two processes syncing the same sheet never share it
+            fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + '.', dir=self.cache_dir)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The in-memory copy still works, it just won't survive a restart
+            pass
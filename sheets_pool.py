@@ -0,0 +1,90 @@
+import threading
+
+from schema import normalize_header
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+
+
+class SheetsPool:
+    """One authorized gspread client, spreadsheet handle and worksheet map per process
+
+    gspread and google-auth are imported on first connect, so code that never
+    talks to a live sheet doesn't pay for them.
+    """
+
+    def __init__(self, creds_info, spreadsheet_key, scopes=SCOPES):
+        self.creds_info = dict(creds_info)
+        self.spreadsheet_key = spreadsheet_key
+        self.scopes = scopes
+        self.creds = None
+        self.client = None
+        self._spreadsheet = None
+        self._titles = None
+        self._worksheets = {}
+        self._lock = threading.RLock()
+
+    def spreadsheet(self):
+        """Return the shared Spreadsheet handle, authorizing on first use"""
+        with self._lock:
+            if self._spreadsheet is None:
+                import gspread
+                from google.oauth2.service_account import Credentials
+
+                self.creds = Credentials.from_service_account_info(self.creds_info, scopes=self.scopes)
+                self.client = gspread.authorize(self.creds)
+                self._spreadsheet = self.client.open_by_key(self.spreadsheet_key)
+            else:
+                self._refresh_token()
+            return self._spreadsheet
+
+    def worksheets(self):
+        """Return {title: worksheet} for the spreadsheet, listed with one metadata request"""
+        with self._lock:
+            if self._titles is None:
+                self._titles = {ws.title: ws for ws in self.spreadsheet().worksheets()}
+            else:
+                self._refresh_token()
+            return self._titles
+
+    def worksheet(self, names):
+        """Return (worksheet, name) for the first of names that exists, or (None, None)
+
+        Names are looked up in the worksheet list, exactly first and then
+        ignoring case and stray spaces. A hit is remembered; a miss lists the
+        worksheets again next time, in case the sheet was added since.
+        """
+        names = tuple(names)
+        with self._lock:
+            if names not in self._worksheets:
+                titles = self.worksheets()
+                normalized = {}
+                for title in titles:
+                    normalized.setdefault(normalize_header(title), title)
+                found = next(((titles[name], name) for name in names if name in titles), None)
+                if found is None:
+                    title = next((normalized[normalize_header(name)] for name in names
+                                  if normalize_header(name) in normalized), None)
+                    if title is None:
+                        self._titles = None
+                        return None, None
+                    found = (titles[title], title)
+                self._worksheets[names] = found
+            else:
+                self._refresh_token()
+            return self._worksheets[names]
+
+    def reset(self):
+        """Drop the client and handles so the next call reconnects from scratch"""
+        with self._lock:
+            self.creds = None
+            self.client = None
+            self._spreadsheet = None
+            self._titles = None
+            self._worksheets = {}
+
+    def _refresh_token(self):
+        """Refresh the access token ahead of time instead of failing a request"""
+        if self.creds is not None and not self.creds.valid:
+            from google.auth.transport.requests import Request
+
+            self.creds.refresh(Request())
@@ -0,0 +1,60 @@
+import threading
+
+
+class _Call:
+    """One in-flight call: its result or error, and an event set when it finishes"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; callers arriving meanwhile share it
+
+    do(key, fn) runs fn unless a call for key is already in flight, in which
+    case it waits for that call and returns (or raises) the same outcome.
+    counters() reports how many calls ran or were coalesced.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._counts = {'requests': 0, 'executed': 0, 'coalesced': 0, 'errors': 0}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            self._counts['requests'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self._counts['coalesced'] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._counts['executed'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._counts['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def counters(self):
+        """Copy of the request/executed/coalesced/error counts"""
+        with self._lock:
+            return dict(self._counts)
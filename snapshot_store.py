@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+# Where the prepared contest/winner frames are written after each load
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.snapshots')
+
+# Name prefix of each saved version's directory
+VERSION_PREFIX = 'snapshot-'
+
+
+# Function to make object columns safe for Parquet
+def parquet_ready(df):
+    """Return df with mixed-type object columns turned into strings"""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            kind = pd.api.types.infer_dtype(df[col], skipna=True)
+            if kind.startswith('mixed'):
+                df[col] = df[col].map(lambda v: v if v is None or isinstance(v, str) or pd.isna(v) else str(v))
+    # Parquet needs string column names
+    df.columns = [str(col) for col in df.columns]
+    return df
+
+
+class SnapshotStore:
+    """Prepared contests and winners saved as Parquet for fast cold starts
+
+    Each save writes a new version directory (both frames plus
+    snapshot.json) and then points the CURRENT file at it with one atomic
+    replace, so a reader always gets frames and metadata from the same
+    save. Temporary names are unique, so processes sharing the directory
+    never write the same file. The previous version is kept for readers
+    still loading it; older ones are removed.
+    """
+
+    def __init__(self, path=SNAPSHOT_DIR):
+        self.path = path
+        self.pointer_path = os.path.join(path, 'CURRENT')
+        self.last_saved = None
+
+    def _current(self):
+        """Name of the published version directory, or None"""
+        try:
+            with open(self.pointer_path, encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def save(self, contests, winners, meta):
+        """Write both frames plus metadata as a new version, returns True on success
+
+        meta must be JSON serializable (column map, fingerprints, sheet name).
+        """
+        key = (meta.get('contest_fingerprint'), meta.get('winner_fingerprint'))
+        if key == self.last_saved:
+            return True
+        version = None
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            version = tempfile.mkdtemp(prefix=VERSION_PREFIX, dir=self.path)
+            for name, df in [('contests', contests), ('winners', winners)]:
+                parquet_ready(df).to_parquet(os.path.join(version, f'{name}.parquet'), index=False)
+            meta = dict(meta, saved_at=datetime.now().isoformat(timespec='seconds'))
+            with open(os.path.join(version, 'snapshot.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+
+            previous = self._current()
+            fd, tmp_path = tempfile.mkstemp(prefix='.CURRENT-', dir=self.path)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(os.path.basename(version))
+            os.replace(tmp_path, self.pointer_path)
+        except Exception:
+            # No pyarrow or read-only disk - the app still works without snapshots
+            if version:
+                shutil.rmtree(version, ignore_errors=True)
+            return False
+        self._prune(keep={os.path.basename(version), previous})
+        self.last_saved = key
+        return True
+
+    def _prune(self, keep):
+        """Remove published versions other than those in keep"""
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(VERSION_PREFIX) and name not in keep:
+                path = os.path.join(self.path, name)
+                # Versions still being written by another process have no snapshot.json yet
+                if os.path.exists(os.path.join(path, 'snapshot.json')):
+                    shutil.rmtree(path, ignore_errors=True)
+
+    def load(self):
+        """Return (contests, winners, meta) from disk, or None if there is no usable snapshot"""
+        version = self._current()
+        if version is None:
+            return None
+        path = os.path.join(self.path, version)
+        try:
+            with open(os.path.join(path, 'snapshot.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+            contests = pd.read_parquet(os.path.join(path, 'contests.parquet'))
+            winners = pd.read_parquet(os.path.join(path, 'winners.parquet'))
+        except Exception:
+            return None
+        self.last_saved = (meta.get('contest_fingerprint'), meta.get('winner_fingerprint'))
+        return contests, winners, meta